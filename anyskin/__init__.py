@@ -1,4 +1,36 @@
-from .sensor import AnySkinBase, AnySkinDummy
+from .baseline import BaselineTracker
+from .catalog import RunCatalog
+from .contact import ContactDetector, ContactEvent
+from .crosstalk import CrosstalkCalibration
+from .features import WindowFeatures
+from .fusion import StreamFusion
+from .interference import InterferenceMonitor
+from .layout import BoardLayout, get_layout, register_layout
+from .recording import RecordingReader, RecordingWriter
+from .replay import Replay
+from .sensor import AnySkinBase, AnySkinDummy, AnySkinReplay
 from .sensor_proc import AnySkinProcess
+from .temperature import TemperatureCalibration, TemperatureCompensator
 
-__all__ = ["AnySkinBase", "AnySkinDummy", "AnySkinProcess"]
+__all__ = [
+    "AnySkinBase",
+    "AnySkinDummy",
+    "AnySkinProcess",
+    "AnySkinReplay",
+    "BaselineTracker",
+    "BoardLayout",
+    "ContactDetector",
+    "ContactEvent",
+    "CrosstalkCalibration",
+    "InterferenceMonitor",
+    "RecordingReader",
+    "RecordingWriter",
+    "Replay",
+    "RunCatalog",
+    "StreamFusion",
+    "TemperatureCalibration",
+    "TemperatureCompensator",
+    "WindowFeatures",
+    "get_layout",
+    "register_layout",
+]
@@ -0,0 +1,112 @@
+import numpy as np
+
+
+class BaselineTracker:
+    """
+    Contact-gated exponential moving average of the AnySkin baseline.
+
+    The baseline is seeded from the mean of the first few samples and then
+    follows slow drift (temperature, creep) with an exponential moving
+    average. Tracking is frozen while any chip deviates from the baseline by
+    more than the contact threshold, and for a short hold-off afterwards, so
+    that presses are never absorbed into the baseline. Each update is O(1)
+    in the number of samples seen.
+
+    Attributes
+    ----------
+    num_mags: int
+        Number of magnetometers on the sensor
+    temp_filtered: bool
+        Flag indicating if samples exclude the temperature channels
+    alpha: float
+        Smoothing factor of the exponential moving average
+    contact_threshold: float or np.ndarray
+        Deviation norm of a chip's field above which the sensor is considered
+        to be in contact; scalar or one value per chip
+    holdoff: int
+        Number of samples to keep the baseline frozen after contact ends
+    init_samples: int
+        Number of samples averaged to seed the baseline
+
+    Methods
+    -------
+    update(sample):
+        Update the baseline with a new sample and return the
+        baseline-subtracted sample
+    rebaseline():
+        Discard the current baseline and re-seed it from upcoming samples
+    """
+
+    def __init__(
+        self,
+        num_mags: int = 1,
+        temp_filtered: bool = True,
+        alpha: float = 0.001,
+        contact_threshold=50.0,
+        holdoff: int = 50,
+        init_samples: int = 5,
+    ):
+        """Initializes a BaselineTracker object."""
+        self.num_mags = num_mags
+        self.temp_filtered = temp_filtered
+        self.alpha = alpha
+        self.contact_threshold = contact_threshold
+        self.holdoff = holdoff
+        self.init_samples = max(1, init_samples)
+
+        num_channels = num_mags * (4 - temp_filtered)
+        self._field_mask = np.ones((num_channels,), dtype=bool)
+        if not temp_filtered:
+            self._field_mask[::4] = False
+        self._threshold_sq = np.square(contact_threshold)
+
+        self.baseline = np.zeros((num_channels,))
+        self.in_contact = False
+        self._seed_cnt = 0
+        self._holdoff_left = 0
+
+    @property
+    def is_seeded(self):
+        return self._seed_cnt >= self.init_samples
+
+    def rebaseline(self):
+        """Discard the current baseline and re-seed it from upcoming samples"""
+        self.baseline[:] = 0.0
+        self.in_contact = False
+        self._seed_cnt = 0
+        self._holdoff_left = 0
+
+    def update(self, sample):
+        """
+        Update the baseline with a new sample
+
+        Parameters
+        ----------
+        sample : np.ndarray
+            Sensor reading without the timestamp
+
+        Returns
+        -------
+        np.ndarray
+            Sample with the updated baseline subtracted
+        """
+        sample = np.asarray(sample, dtype=float)
+        if not self.is_seeded:
+            self._seed_cnt += 1
+            self.baseline += (sample - self.baseline) / self._seed_cnt
+            return sample - self.baseline
+
+        delta = sample - self.baseline
+        field = delta[self._field_mask].reshape(-1, 3)
+        self.in_contact = bool(
+            np.any(np.einsum("ij,ij->i", field, field) > self._threshold_sq)
+        )
+        if self.in_contact:
+            self._holdoff_left = self.holdoff
+        elif self._holdoff_left > 0:
+            self._holdoff_left -= 1
+        else:
+            self.baseline += self.alpha * delta
+            delta *= 1.0 - self.alpha
+
+        return delta
@@ -0,0 +1,387 @@
+import argparse
+import json
+import os
+import sqlite3
+
+import numpy as np
+
+from .legacy import (
+    channel_names,
+    find_recordings,
+    infer_columns,
+    iter_blocks,
+    recorded_at,
+)
+from .recording import RECORDING_EXT, RecordingReader
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    name TEXT NOT NULL,
+    date TEXT,
+    recorded_at TEXT,
+    format TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    num_frames INTEGER NOT NULL,
+    num_mags INTEGER,
+    temp_filtered INTEGER,
+    start_time REAL,
+    duration REAL,
+    metadata TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_date ON runs (date);
+CREATE TABLE IF NOT EXISTS channel_stats (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    channel INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    first REAL,
+    last REAL,
+    mean REAL,
+    std REAL,
+    min REAL,
+    max REAL,
+    PRIMARY KEY (run_id, channel)
+);
+"""
+
+class RunStats:
+    """
+    Per-channel summary statistics accumulated over blocks of frames.
+
+    Means and variances are merged block by block with the Chan et al.
+    parallel update, so a run of any length is summarized in one streaming
+    pass.
+    """
+
+    def __init__(self, num_channels: int):
+        """Initializes a RunStats object."""
+        self.count = 0
+        self.first = None
+        self.last = None
+        self.mean = np.zeros((num_channels,))
+        self.m2 = np.zeros((num_channels,))
+        self.min = np.full((num_channels,), np.inf)
+        self.max = np.full((num_channels,), -np.inf)
+
+    def update(self, block):
+        block = np.asarray(block, dtype=float)
+        n = len(block)
+        if n == 0:
+            return
+        if self.first is None:
+            self.first = block[0].copy()
+        self.last = block[-1].copy()
+        mean = block.mean(axis=0)
+        m2 = ((block - mean) ** 2).sum(axis=0)
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * (n / total)
+        self.m2 += m2 + delta**2 * (self.count * n / total)
+        self.count = total
+        np.minimum(self.min, block.min(axis=0), out=self.min)
+        np.maximum(self.max, block.max(axis=0), out=self.max)
+
+    @property
+    def std(self):
+        return np.sqrt(self.m2 / max(self.count, 1))
+
+
+def summarize(path: str, block_rows: int = 100000):
+    """
+    Summarize a recording in one streaming pass
+
+    Parameters
+    ----------
+    path : str
+        Native or legacy recording
+
+    Returns
+    -------
+    info : dict
+        Run-level fields of the runs table
+    stats : RunStats
+        Per-channel statistics, without the timestamp column
+    """
+    if path.endswith(RECORDING_EXT):
+        with RecordingReader(path) as reader:
+            stats = RunStats(reader.num_channels)
+            for start in range(0, len(reader), block_rows):
+                stats.update(reader.read(start, start + block_rows)[1])
+            info = {
+                "format": "anyskin",
+                "num_mags": reader.num_mags,
+                "temp_filtered": reader.temp_filtered,
+                "start_time": reader.start_time,
+                "duration": reader.duration,
+                "metadata": reader.header,
+            }
+        return info, stats
+
+    stats = None
+    has_timestamp = False
+    start_time = end_time = None
+    for block in iter_blocks(path, block_rows):
+        if stats is None:
+            has_timestamp, num_mags, temp_filtered = infer_columns(block[:100])
+            stats = RunStats(block.shape[1] - has_timestamp)
+            if has_timestamp:
+                start_time = block[0, 0]
+        if has_timestamp:
+            end_time = block[-1, 0]
+            block = block[:, 1:]
+        stats.update(block)
+    if stats is None:
+        raise ValueError(f"{path} is empty")
+    info = {
+        "format": os.path.splitext(path)[1][1:],
+        "num_mags": num_mags,
+        "temp_filtered": temp_filtered,
+        "start_time": start_time,
+        "duration": None if start_time is None else end_time - start_time,
+        "metadata": None,
+    }
+    return info, stats
+
+
+class RunCatalog:
+    """
+    SQLite catalog of the recordings below a directory.
+
+    Every run is indexed once with its metadata, duration, sample count and
+    per-channel first/last/mean/std/min/max, so that summaries can be queried
+    without opening any data file. update() only re-reads recordings that are
+    new or whose size or modification time changed, and drops runs whose
+    files were deleted.
+
+    Attributes
+    ----------
+    root: str
+        Directory the recordings are stored under
+    db_path: str
+        Path of the SQLite database; catalog.sqlite in root by default
+
+    Methods
+    -------
+    update():
+        Index new and changed recordings
+    runs(date=None, since=None, until=None):
+        Run-level records, oldest first
+    channel_stats(run_ids=None):
+        Per-channel statistics of runs
+    last_readings(date=None):
+        Last frame of every run
+    """
+
+    def __init__(self, root: str, db_path: str = None):
+        """Initializes a RunCatalog object."""
+        self.root = os.path.abspath(root)
+        self.db_path = db_path or os.path.join(self.root, "catalog.sqlite")
+        self._db = sqlite3.connect(self.db_path)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA foreign_keys = ON")
+        self._db.executescript(_SCHEMA)
+
+    def update(self, verbose: bool = False):
+        """
+        Index new and changed recordings
+
+        Returns
+        -------
+        added, updated, removed : int
+            Number of runs added, re-indexed and dropped
+        """
+        known = {
+            row["path"]: (row["size"], row["mtime"])
+            for row in self._db.execute("SELECT path, size, mtime FROM runs")
+        }
+        added = updated = 0
+        seen = set()
+        for path in find_recordings(self.root):
+            relpath = os.path.relpath(path, self.root)
+            seen.add(relpath)
+            stat = os.stat(path)
+            if known.get(relpath) == (stat.st_size, stat.st_mtime):
+                continue
+            try:
+                info, stats = summarize(path)
+            except (ValueError, OSError, ImportError) as e:
+                print(f"Warning: skipping {relpath}: {e}")
+                continue
+            if relpath in known:
+                updated += 1
+            else:
+                added += 1
+            if verbose:
+                print(f"Indexed {relpath} ({stats.count} frames)")
+            self._insert(relpath, stat, info, stats)
+
+        removed = [path for path in known if path not in seen]
+        self._db.executemany(
+            "DELETE FROM runs WHERE path = ?", [(path,) for path in removed]
+        )
+        self._db.commit()
+        return added, updated, len(removed)
+
+    def _insert(self, relpath, stat, info, stats):
+        date, when = recorded_at(relpath, stat.st_mtime)
+        dirname, filename = os.path.split(relpath)
+        stem = os.path.splitext(filename)[0]
+        name = dirname if stem == "buffered_data" else os.path.join(dirname, stem)
+        self._db.execute("DELETE FROM runs WHERE path = ?", (relpath,))
+        cursor = self._db.execute(
+            "INSERT INTO runs (path, name, date, recorded_at, format, size, "
+            "mtime, num_frames, num_mags, temp_filtered, start_time, duration, "
+            "metadata) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                relpath,
+                name,
+                date,
+                when,
+                info["format"],
+                stat.st_size,
+                stat.st_mtime,
+                stats.count,
+                info["num_mags"],
+                info["temp_filtered"],
+                info["start_time"],
+                info["duration"],
+                json.dumps(info["metadata"]),
+            ),
+        )
+        names = channel_names(info["num_mags"], info["temp_filtered"])
+        std = stats.std
+        self._db.executemany(
+            "INSERT INTO channel_stats VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    cursor.lastrowid,
+                    channel,
+                    names[channel] if channel < len(names) else str(channel),
+                    stats.first[channel],
+                    stats.last[channel],
+                    stats.mean[channel],
+                    std[channel],
+                    stats.min[channel],
+                    stats.max[channel],
+                )
+                for channel in range(len(stats.mean))
+            ],
+        )
+
+    def _where(self, date=None, since=None, until=None):
+        clauses, params = [], []
+        if date is not None:
+            clauses.append("date = ?")
+            params.append(date)
+        if since is not None:
+            clauses.append("date >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("date <= ?")
+            params.append(until)
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        return where, params
+
+    def runs(self, date: str = None, since: str = None, until: str = None):
+        """
+        Run-level records, oldest first
+
+        Parameters
+        ----------
+        date, since, until : str
+            Restrict to runs recorded on, from or up to a YYYY-MM-DD date
+
+        Returns
+        -------
+        list of dict
+        """
+        where, params = self._where(date, since, until)
+        rows = self._db.execute(
+            "SELECT * FROM runs" + where + " ORDER BY recorded_at, path", params
+        )
+        return [dict(row) for row in rows]
+
+    def channel_stats(self, run_ids=None):
+        """
+        Per-channel statistics of runs
+
+        Returns
+        -------
+        list of dict
+            One record per run and channel, ordered by run and channel
+        """
+        query = "SELECT * FROM channel_stats"
+        params = []
+        if run_ids is not None:
+            run_ids = list(run_ids)
+            query += " WHERE run_id IN ({})".format(",".join("?" * len(run_ids)))
+            params = run_ids
+        rows = self._db.execute(query + " ORDER BY run_id, channel", params)
+        return [dict(row) for row in rows]
+
+    def statistic(self, column: str, date=None, since=None, until=None):
+        """
+        One statistic of every channel of every run, oldest run first
+
+        Parameters
+        ----------
+        column : str
+            One of first, last, mean, std, min or max
+
+        Returns
+        -------
+        runs : list of dict
+            Run-level records
+        values : np.ndarray
+            (num_runs, num_channels) statistic, NaN-padded if runs differ in
+            channel count
+        """
+        if column not in ("first", "last", "mean", "std", "min", "max"):
+            raise ValueError(f"Unknown statistic {column}")
+        runs = self.runs(date, since, until)
+        row_of = {run["id"]: i for i, run in enumerate(runs)}
+        where, params = self._where(date, since, until)
+        rows = self._db.execute(
+            "SELECT run_id, channel, {} FROM channel_stats WHERE run_id IN "
+            "(SELECT id FROM runs{})".format(column, where),
+            params,
+        ).fetchall()
+        num_channels = max((row[1] for row in rows), default=-1) + 1
+        values = np.full((len(runs), num_channels), np.nan)
+        for run_id, channel, value in rows:
+            values[row_of[run_id], channel] = value
+        return runs, values
+
+    def last_readings(self, date: str = None, since: str = None, until: str = None):
+        """Last frame of every run, as returned by statistic("last", ...)"""
+        return self.statistic("last", date, since, until)
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == "__main__":
+    # fmt: off
+    parser = argparse.ArgumentParser(description="Index AnySkin recordings below a directory into a SQLite catalog")
+    parser.add_argument("root", type=str, help="directory to index, e.g. viz/logs")
+    parser.add_argument("--db", type=str, help="path of the catalog database; defaults to catalog.sqlite in root", default=None)
+    parser.add_argument("-d", "--date", type=str, help="list the runs recorded on this YYYY-MM-DD date", default=None)
+    parser.add_argument("-v", "--verbose", action="store_true", help="print every indexed recording")
+    args = parser.parse_args()
+    # fmt: on
+
+    with RunCatalog(args.root, args.db) as catalog:
+        added, updated, removed = catalog.update(verbose=args.verbose)
+        print(f"Added {added}, updated {updated}, removed {removed} runs")
+        for run in catalog.runs(date=args.date):
+            print(
+                "{recorded_at}  {name}  {num_frames} frames  {format}".format(**run)
+            )
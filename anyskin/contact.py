@@ -0,0 +1,159 @@
+from collections import namedtuple
+
+import numpy as np
+
+ContactEvent = namedtuple("ContactEvent", ["time", "chip", "kind", "norm"])
+ContactEvent.__doc__ = """
+Contact onset or offset on a single magnetometer.
+
+Attributes
+----------
+time: float
+    Timestamp of the frame on which the transition was confirmed
+chip: int
+    Index of the magnetometer
+kind: str
+    "onset" or "offset"
+norm: float
+    Norm of the baseline-subtracted field on that frame
+"""
+
+
+def _run_lengths(flags, carry):
+    """
+    Length of the run of consecutive True values ending at every frame.
+
+    Parameters
+    ----------
+    flags : np.ndarray
+        (N, M) boolean array
+    carry : np.ndarray
+        (M,) run lengths at the end of the previous batch
+    """
+    frames = np.arange(flags.shape[0])[:, None]
+    last_false = np.maximum.accumulate(np.where(flags, -1, frames), axis=0)
+    return np.where(last_false >= 0, frames - last_false, frames + 1 + carry)
+
+
+def _last_index(flags):
+    """Index of the last True value at or before every frame; -1 if none."""
+    frames = np.arange(flags.shape[0])[:, None]
+    return np.maximum.accumulate(np.where(flags, frames, -1), axis=0)
+
+
+class ContactDetector:
+    """
+    Per-chip contact detector with hysteresis and debounce.
+
+    A chip goes into contact once the norm of its baseline-subtracted field
+    stays above the onset threshold for `debounce` consecutive frames, and
+    leaves contact once it stays below the offset threshold for as long.
+    Batches of frames are processed without a Python loop over frames, and
+    state carries over between batches so that results do not depend on how
+    the stream is split.
+
+    Attributes
+    ----------
+    num_mags: int
+        Number of magnetometers on the sensor
+    temp_filtered: bool
+        Flag indicating if samples exclude the temperature channels
+    on_threshold: float or np.ndarray
+        Field norm above which a chip is considered in contact; scalar or one
+        value per chip
+    off_threshold: float or np.ndarray
+        Field norm below which a chip is considered released; defaults to half
+        of on_threshold
+    debounce: int
+        Number of consecutive frames required to confirm a transition
+
+    Methods
+    -------
+    update(times, deltas):
+        Process a batch of baseline-subtracted frames and return the contact
+        events it contains
+    reset():
+        Clear contact state
+    """
+
+    def __init__(
+        self,
+        num_mags: int = 1,
+        temp_filtered: bool = True,
+        on_threshold=50.0,
+        off_threshold=None,
+        debounce: int = 2,
+    ):
+        """Initializes a ContactDetector object."""
+        self.num_mags = num_mags
+        self.temp_filtered = temp_filtered
+        self.on_threshold = np.broadcast_to(
+            np.asarray(on_threshold, dtype=float), (num_mags,)
+        )
+        if off_threshold is None:
+            off_threshold = 0.5 * self.on_threshold
+        self.off_threshold = np.broadcast_to(
+            np.asarray(off_threshold, dtype=float), (num_mags,)
+        )
+        if np.any(self.off_threshold > self.on_threshold):
+            raise ValueError("off_threshold must not exceed on_threshold")
+        self.debounce = max(1, debounce)
+
+        self._field_mask = np.ones((num_mags * (4 - temp_filtered),), dtype=bool)
+        if not temp_filtered:
+            self._field_mask[::4] = False
+        self.reset()
+
+    def reset(self):
+        """Clear contact state"""
+        self.in_contact = np.zeros((self.num_mags,), dtype=bool)
+        self._above_run = np.zeros((self.num_mags,), dtype=np.int64)
+        self._below_run = np.zeros((self.num_mags,), dtype=np.int64)
+
+    def update(self, times, deltas):
+        """
+        Process a batch of baseline-subtracted frames
+
+        Parameters
+        ----------
+        times : np.ndarray
+            (N,) timestamps of the frames
+        deltas : np.ndarray
+            (N, D) baseline-subtracted frames without timestamps
+
+        Returns
+        -------
+        list of ContactEvent
+            Events in the batch, ordered by frame and chip
+        """
+        times = np.atleast_1d(np.asarray(times, dtype=float))
+        deltas = np.atleast_2d(np.asarray(deltas, dtype=float))
+        if len(deltas) == 0:
+            return []
+        field = deltas[:, self._field_mask].reshape(len(deltas), self.num_mags, 3)
+        norms = np.linalg.norm(field, axis=-1)
+
+        above_run = _run_lengths(norms > self.on_threshold, self._above_run)
+        below_run = _run_lengths(norms < self.off_threshold, self._below_run)
+        last_on = _last_index(above_run >= self.debounce)
+        last_off = _last_index(below_run >= self.debounce)
+        state = np.where(
+            np.maximum(last_on, last_off) < 0, self.in_contact, last_on > last_off
+        )
+
+        previous = np.vstack((self.in_contact[None], state[:-1]))
+        frames, chips = np.nonzero(state != previous)
+
+        self.in_contact = state[-1].copy()
+        self._above_run = above_run[-1]
+        self._below_run = below_run[-1]
+
+        return [
+            ContactEvent(
+                float(times[f]),
+                int(c),
+                "onset" if state[f, c] else "offset",
+                float(norms[f, c]),
+            )
+            for f, c in zip(frames, chips)
+        ]
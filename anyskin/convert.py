@@ -0,0 +1,200 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from .legacy import find_recordings, infer_columns, iter_blocks, recorded_at
+from .recording import RECORDING_EXT, RecordingReader, RecordingWriter
+
+# Layouts assumed for legacy recordings, by magnetometer count
+DEFAULT_LAYOUTS = {5: "anyskin", 10: "anyskin_pair"}
+
+
+def output_path(path: str, root: str, output_dir: str = None):
+    """Native recording a legacy recording is converted to"""
+    stem = os.path.splitext(path)[0]
+    if output_dir is not None:
+        stem = os.path.join(output_dir, os.path.relpath(stem, root))
+    return stem + RECORDING_EXT
+
+
+def convert(
+    path: str,
+    output: str,
+    layout: str = None,
+    rate: float = 100.0,
+    block_rows: int = 100000,
+):
+    """
+    Convert one legacy recording to the native format
+
+    The recording is parsed block by block, so memory use does not depend on
+    its length. It is written to a temporary file that only replaces output
+    once the number of frames read back matches the number of rows parsed,
+    so an interrupted conversion never leaves a partial recording behind.
+
+    Parameters
+    ----------
+    path : str
+        Legacy recording (np.savetxt text, CSV, .npy, .h5 or .json)
+    output : str
+        Path of the native recording to write
+    layout : str
+        Registered layout name; inferred from the magnetometer count if None
+    rate : float
+        Sample rate, in Hz, used to timestamp recordings without timestamps,
+        starting at the recording time parsed from the path
+    block_rows : int
+        Number of rows parsed at a time
+
+    Returns
+    -------
+    int
+        Number of frames converted
+    """
+    partial = output + ".partial"
+    blocks = iter_blocks(path, block_rows)
+    first = next(blocks, None)
+    if first is None or len(first) == 0:
+        raise ValueError(f"{path} is empty")
+    has_timestamp, num_mags, temp_filtered = infer_columns(first[:100])
+
+    metadata = {"source": os.path.basename(path)}
+    if not has_timestamp:
+        _, when = recorded_at(path, os.path.getmtime(path))
+        start_ns = int(
+            time.mktime(
+                time.strptime(when, "%Y-%m-%dT%H:%M:%S" if "T" in when else "%Y-%m-%d")
+            )
+        ) * 10**9
+        metadata.update(synthetic_timestamps=True, rate=rate)
+
+    num_rows = 0
+    with RecordingWriter(
+        partial,
+        num_mags,
+        temp_filtered,
+        layout=layout or DEFAULT_LAYOUTS.get(num_mags),
+        metadata=metadata,
+        chunk_size=min(block_rows, 10000),
+    ) as writer:
+        for block in _chain(first, blocks):
+            if has_timestamp:
+                times = np.round(block[:, 0] * 1e9).astype(np.int64)
+                data = block[:, 1:]
+            else:
+                frames = num_rows + np.arange(len(block))
+                times = start_ns + np.round(frames * 1e9 / rate).astype(np.int64)
+                data = block
+            writer.write_frames(times, data)
+            num_rows += len(block)
+
+    with RecordingReader(partial) as reader:
+        num_frames = len(reader)
+    if num_frames != num_rows:
+        os.remove(partial)
+        raise ValueError(f"{path}: parsed {num_rows} rows but wrote {num_frames}")
+    os.replace(partial, output)
+    return num_rows
+
+
+def _chain(first, blocks):
+    yield first
+    for block in blocks:
+        yield block
+
+
+def _convert_one(args):
+    path, output, layout, rate, block_rows = args
+    try:
+        return path, convert(path, output, layout, rate, block_rows), None
+    except Exception as e:
+        return path, 0, "{}: {}".format(type(e).__name__, e)
+
+
+def convert_tree(
+    root: str,
+    output_dir: str = None,
+    layout: str = None,
+    rate: float = 100.0,
+    jobs: int = None,
+    overwrite: bool = False,
+    block_rows: int = 100000,
+):
+    """
+    Convert every legacy recording below a directory, in parallel
+
+    Recordings whose native version already exists are skipped unless
+    overwrite is set, so an interrupted run can simply be restarted.
+
+    Parameters
+    ----------
+    root : str
+        Directory to search for legacy recordings
+    output_dir : str
+        Directory to mirror converted recordings into; next to the legacy
+        recordings if None
+    jobs : int
+        Number of worker processes; one per core if None
+
+    Returns
+    -------
+    converted : list of tuple
+        (path, number of frames) of every converted recording
+    skipped : list of str
+        Recordings that were already converted
+    failed : list of tuple
+        (path, error) of every recording that could not be converted
+    """
+    todo, skipped = [], []
+    for path in find_recordings(root):
+        if path.endswith(RECORDING_EXT):
+            continue
+        output = output_path(path, root, output_dir)
+        if os.path.exists(output) and not overwrite:
+            skipped.append(path)
+            continue
+        os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+        todo.append((path, output, layout, rate, block_rows))
+
+    converted, failed = [], []
+    if not todo:
+        return converted, skipped, failed
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        # Largest files first, so that one long file does not finish last
+        todo.sort(key=lambda task: os.path.getsize(task[0]), reverse=True)
+        futures = [pool.submit(_convert_one, task) for task in todo]
+        for future in as_completed(futures):
+            path, num_rows, error = future.result()
+            if error is None:
+                converted.append((path, num_rows))
+            else:
+                failed.append((path, error))
+    return converted, skipped, failed
+
+
+if __name__ == "__main__":
+    # fmt: off
+    parser = argparse.ArgumentParser(description="Convert legacy AnySkin recordings (np.savetxt dumps, buffered_data.csv/.json/.h5) below a directory to the native binary format")
+    parser.add_argument("root", type=str, help="directory to search for legacy recordings")
+    parser.add_argument("-o", "--output-dir", type=str, help="directory to mirror converted recordings into; defaults to next to the originals", default=None)
+    parser.add_argument("-l", "--layout", type=str, help="registered layout of the recorded boards; inferred from the magnetometer count by default", default=None)
+    parser.add_argument("-r", "--rate", type=float, help="sample rate assumed for recordings without timestamps", default=100.0)
+    parser.add_argument("-j", "--jobs", type=int, help="number of worker processes; defaults to one per core", default=None)
+    parser.add_argument("--overwrite", action="store_true", help="convert recordings that were already converted")
+    args = parser.parse_args()
+    # fmt: on
+
+    converted, skipped, failed = convert_tree(
+        args.root, args.output_dir, args.layout, args.rate, args.jobs, args.overwrite
+    )
+    for path, error in failed:
+        print(f"Warning: could not convert {path}: {error}")
+    print(
+        "Converted {} recordings ({} frames), skipped {} already converted, "
+        "{} failed".format(
+            len(converted), sum(n for _, n in converted), len(skipped), len(failed)
+        )
+    )
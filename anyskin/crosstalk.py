@@ -0,0 +1,257 @@
+import argparse
+import os
+import time
+
+import numpy as np
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.path.expanduser("~"), ".cache", "anyskin", "crosstalk"
+)
+
+
+class CrosstalkCalibration:
+    """
+    Linear crosstalk model between two neighbouring AnySkin boards.
+
+    Observed baseline-subtracted fields are modelled as
+    [A, B] = [A_true, B_true] @ [[I, W_ab], [W_ba, I]], where W_ab is the
+    leakage of board A's magnets into board B's chips and W_ba the reverse.
+    Both matrices are fitted by least squares from recordings in which only
+    one of the boards is pressed. At runtime, the leakage is removed from a
+    whole batch of frames with a single matmul against the precomputed
+    inverse of the mixing matrix.
+
+    Attributes
+    ----------
+    num_mags_a: int
+        Number of magnetometers on board A
+    num_mags_b: int
+        Number of magnetometers on board B
+    board_ids: tuple
+        Identifiers of board A and board B, used as the cache key
+    temp_filtered: bool
+        Flag indicating if frames exclude the temperature channels
+
+    Methods
+    -------
+    fit(press_a, press_b, ridge=1e-6):
+        Fit the mixing matrix from recordings of each board pressed in turn
+    apply(samples):
+        Remove crosstalk from a batch of frames
+    save(cache_dir=DEFAULT_CACHE_DIR):
+        Save the calibration, keyed by board IDs
+    load(board_ids, num_mags_a, num_mags_b, cache_dir=DEFAULT_CACHE_DIR):
+        Load a cached calibration; returns None if there is none
+    """
+
+    def __init__(
+        self,
+        num_mags_a: int = 5,
+        num_mags_b: int = 5,
+        board_ids=(0, 1),
+        temp_filtered: bool = True,
+    ):
+        """Initializes a CrosstalkCalibration object."""
+        self.num_mags_a = num_mags_a
+        self.num_mags_b = num_mags_b
+        self.board_ids = tuple(board_ids)
+        self.temp_filtered = temp_filtered
+
+        num_mags = num_mags_a + num_mags_b
+        self._field_mask = np.ones((num_mags * (4 - temp_filtered),), dtype=bool)
+        if not temp_filtered:
+            self._field_mask[::4] = False
+        self._dim_a = 3 * num_mags_a
+        self.mixing = np.eye(3 * num_mags)
+        self._unmixing = np.eye(3 * num_mags)
+
+    @property
+    def leakage_ab(self):
+        """Leakage of board A's field into board B's channels"""
+        return self.mixing[: self._dim_a, self._dim_a :]
+
+    @property
+    def leakage_ba(self):
+        """Leakage of board B's field into board A's channels"""
+        return self.mixing[self._dim_a :, : self._dim_a]
+
+    def _field(self, samples):
+        return np.atleast_2d(np.asarray(samples, dtype=float))[:, self._field_mask]
+
+    def fit(self, press_a, press_b, ridge: float = 1e-6):
+        """
+        Fit the mixing matrix from recordings of each board pressed in turn
+
+        Parameters
+        ----------
+        press_a : np.ndarray
+            (N, D) baseline-subtracted frames of both boards, recorded while
+            only board A was pressed
+        press_b : np.ndarray
+            (N, D) baseline-subtracted frames recorded while only board B was
+            pressed
+        ridge : float
+            Tikhonov regularization, relative to the source channels' power
+        """
+        field_a = self._field(press_a)
+        field_b = self._field(press_b)
+        dim_a = self._dim_a
+
+        def solve(source, target):
+            gram = source.T @ source
+            gram += ridge * np.trace(gram) / len(gram) * np.eye(len(gram))
+            return np.linalg.solve(gram, source.T @ target)
+
+        self.mixing = np.eye(field_a.shape[1])
+        self.mixing[:dim_a, dim_a:] = solve(field_a[:, :dim_a], field_a[:, dim_a:])
+        self.mixing[dim_a:, :dim_a] = solve(field_b[:, dim_a:], field_b[:, :dim_a])
+        self._unmixing = np.linalg.inv(self.mixing)
+        return self
+
+    def apply(self, samples):
+        """
+        Remove crosstalk from a batch of frames
+
+        Parameters
+        ----------
+        samples : np.ndarray
+            (D,) frame or (N, D) baseline-subtracted frames of both boards,
+            without timestamps
+
+        Returns
+        -------
+        np.ndarray
+            Compensated frames with the same shape as samples
+        """
+        samples = np.asarray(samples, dtype=float)
+        out = np.array(samples, ndmin=2)
+        out[:, self._field_mask] = out[:, self._field_mask] @ self._unmixing
+        return out.reshape(samples.shape)
+
+    @staticmethod
+    def cache_path(board_ids, cache_dir: str = DEFAULT_CACHE_DIR):
+        return os.path.join(
+            cache_dir, "crosstalk_{}.npz".format("_".join(str(b) for b in board_ids))
+        )
+
+    def save(self, cache_dir: str = DEFAULT_CACHE_DIR):
+        """
+        Save the calibration, keyed by board IDs
+
+        Parameters
+        ----------
+        cache_dir : str
+            Directory to store calibrations in
+        """
+        os.makedirs(cache_dir, exist_ok=True)
+        path = self.cache_path(self.board_ids, cache_dir)
+        np.savez(
+            path,
+            mixing=self.mixing,
+            num_mags=[self.num_mags_a, self.num_mags_b],
+            board_ids=np.array([str(b) for b in self.board_ids]),
+        )
+        return path
+
+    @classmethod
+    def load(
+        cls,
+        board_ids,
+        num_mags_a: int = 5,
+        num_mags_b: int = 5,
+        temp_filtered: bool = True,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+    ):
+        """
+        Load a cached calibration
+
+        Parameters
+        ----------
+        board_ids : tuple
+            Identifiers of board A and board B
+        cache_dir : str
+            Directory calibrations are stored in
+
+        Returns
+        -------
+        CrosstalkCalibration or None
+            None if no calibration is cached for these boards, or if it was
+            made for a different number of magnetometers
+        """
+        path = cls.cache_path(board_ids, cache_dir)
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as cached:
+            if list(cached["num_mags"]) != [num_mags_a, num_mags_b]:
+                print(f"Warning: ignoring {path}; magnetometer count mismatch")
+                return None
+            calibration = cls(num_mags_a, num_mags_b, board_ids, temp_filtered)
+            calibration.mixing = cached["mixing"]
+        calibration._unmixing = np.linalg.inv(calibration.mixing)
+        return calibration
+
+
+def record_calibration(sensor_stream, duration: float = 5.0):
+    """
+    Interactively record both boards while each is pressed in turn
+
+    Parameters
+    ----------
+    sensor_stream : AnySkinProcess
+        Running process streaming both boards as one sensor, board A first
+    duration : float
+        Time, in seconds, to record each board for
+
+    Returns
+    -------
+    press_a, press_b : np.ndarray
+        Baseline-subtracted frames recorded while pressing board A and B
+    """
+    segments = []
+    for board in ("A", "B"):
+        input(
+            f"Release both boards, then press Enter and keep pressing and "
+            f"moving around board {board} only for {duration:.0f} s"
+        )
+        sensor_stream.rebaseline()
+        time.sleep(0.2)
+        baseline = sensor_stream.baseline
+        sensor_stream.start_buffering()
+        time.sleep(duration)
+        buffer = np.array(sensor_stream.get_buffer(pause_if_buffering=True))
+        segments.append(buffer[:, 1:] - baseline)
+        print(f"Recorded {len(buffer)} samples for board {board}")
+    return segments[0], segments[1]
+
+
+if __name__ == "__main__":
+    from .sensor_proc import AnySkinProcess
+
+    # fmt: off
+    parser = argparse.ArgumentParser(description="Calibrate crosstalk between two AnySkin boards streamed by one microcontroller")
+    parser.add_argument("-p", "--port", type=str, help="port to which the microcontroller is connected", required=True)
+    parser.add_argument("-na", "--num-mags-a", type=int, help="number of magnetometers on board A", default=5)
+    parser.add_argument("-nb", "--num-mags-b", type=int, help="number of magnetometers on board B", default=5)
+    parser.add_argument("-id", "--board-ids", type=str, nargs=2, help="identifiers of board A and board B", required=True)
+    parser.add_argument("-d", "--duration", type=float, help="seconds to record each board for", default=5.0)
+    parser.add_argument("--cache-dir", type=str, help="directory to store calibrations in", default=DEFAULT_CACHE_DIR)
+    args = parser.parse_args()
+    # fmt: on
+
+    sensor_stream = AnySkinProcess(
+        num_mags=args.num_mags_a + args.num_mags_b,
+        port=args.port,
+    )
+    sensor_stream.start()
+    time.sleep(1.0)
+
+    press_a, press_b = record_calibration(sensor_stream, args.duration)
+    calibration = CrosstalkCalibration(
+        args.num_mags_a, args.num_mags_b, args.board_ids
+    ).fit(press_a, press_b)
+    print("Max leakage A->B: {:.3f}".format(np.abs(calibration.leakage_ab).max()))
+    print("Max leakage B->A: {:.3f}".format(np.abs(calibration.leakage_ba).max()))
+    print("Saved calibration to", calibration.save(args.cache_dir))
+
+    sensor_stream.pause_streaming()
+    sensor_stream.join()
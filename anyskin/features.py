@@ -0,0 +1,187 @@
+import numpy as np
+
+FEATURE_NAMES = ("mean", "std", "min", "max", "slope")
+
+
+class WindowFeatures:
+    """
+    Sliding-window features of AnySkin data, maintained incrementally.
+
+    Every update costs O(1) per channel: mean and variance follow a sliding
+    Welford update, the least-squares slope is kept through running sums,
+    min/max use the van Herk/Gil-Werman block scheme and band powers come from
+    a sliding DFT over the bins that fall in the requested bands. Once per
+    window the running sums are recomputed from the ring buffer to stop
+    floating-point drift, which amortizes to O(log window) per frame.
+
+    Attributes
+    ----------
+    num_channels: int
+        Number of data channels (excluding the timestamp)
+    window: int
+        Number of frames in the window
+    sample_rate: float
+        Sample rate of the stream in Hz; used for the slope and band edges
+    bands: list of tuple
+        (low, high) frequency bands in Hz, inclusive of low and exclusive of
+        high, over which power is reported
+
+    Methods
+    -------
+    update(samples):
+        Add one frame or a batch of frames to the window
+    features:
+        Current (num_channels * num_features,) feature vector, channel-major
+    """
+
+    def __init__(
+        self,
+        num_channels: int,
+        window: int = 50,
+        sample_rate: float = 200.0,
+        bands=((1.0, 5.0), (5.0, 20.0), (20.0, 50.0)),
+    ):
+        """Initializes a WindowFeatures object."""
+        self.num_channels = num_channels
+        self.window = window
+        self.sample_rate = sample_rate
+        self.bands = [tuple(b) for b in bands]
+
+        bin_freqs = np.fft.rfftfreq(window, d=1.0 / sample_rate)
+        band_masks = np.array(
+            [(bin_freqs >= lo) & (bin_freqs < hi) for lo, hi in self.bands]
+        ).reshape(len(self.bands), -1)
+        self._bins = np.nonzero(band_masks.any(axis=0))[0]
+        self._band_masks = band_masks[:, self._bins].astype(float)
+        self._twiddle = np.exp(2j * np.pi * self._bins / window)[:, None]
+        # One-sided power per bin, so that a unit sine has power 0.5
+        self._bin_scale = np.where(
+            (self._bins == 0) | (2 * self._bins == window), 1.0, 2.0
+        )[:, None] / window**2
+
+        k = np.arange(window, dtype=float)
+        self._k_sum = np.cumsum(k)
+        self._kk_sum = np.cumsum(k * k)
+
+        self._features = np.zeros((num_channels, self.num_features))
+        self.reset()
+
+    @property
+    def num_features(self):
+        return len(FEATURE_NAMES) + len(self.bands)
+
+    @property
+    def feature_names(self):
+        names = list(FEATURE_NAMES) + [
+            "power_{:g}_{:g}Hz".format(lo, hi) for lo, hi in self.bands
+        ]
+        return [
+            "{}_{}".format(name, ch)
+            for ch in range(self.num_channels)
+            for name in names
+        ]
+
+    @property
+    def is_ready(self):
+        return self._count >= self.window
+
+    def reset(self):
+        """Clear the window"""
+        shape = (self.num_channels,)
+        self._ring = np.zeros((self.window, self.num_channels))
+        self._count = 0
+        self._mean = np.zeros(shape)
+        self._m2 = np.zeros(shape)
+        self._sum = np.zeros(shape)
+        self._k_weighted_sum = np.zeros(shape)
+        self._dft = np.zeros((len(self._bins), self.num_channels), dtype=complex)
+        self._prefix_min = np.full(shape, np.inf)
+        self._prefix_max = np.full(shape, -np.inf)
+        self._suffix_min = np.full((self.window + 1, self.num_channels), np.inf)
+        self._suffix_max = np.full((self.window + 1, self.num_channels), -np.inf)
+
+    def update(self, samples):
+        """
+        Add one frame or a batch of frames to the window
+
+        Parameters
+        ----------
+        samples : np.ndarray
+            (D,) frame or (N, D) frames without timestamps
+        """
+        for x in np.atleast_2d(np.asarray(samples, dtype=float)):
+            self._update_one(x)
+
+    def _update_one(self, x):
+        pos = self._count % self.window
+        x_old = self._ring[pos].copy()
+        self._ring[pos] = x
+
+        if self._count < self.window:
+            n = self._count + 1
+            delta = x - self._mean
+            self._mean += delta / n
+            self._m2 += delta * (x - self._mean)
+            self._k_weighted_sum += self._count * x
+        else:
+            old_mean = self._mean.copy()
+            self._mean += (x - x_old) / self.window
+            self._m2 += (x - x_old) * (x - self._mean + x_old - old_mean)
+            self._k_weighted_sum += (self.window - 1) * x - (self._sum - x_old)
+        self._sum += x - x_old
+        self._dft = (self._dft + (x - x_old)) * self._twiddle
+
+        if pos == 0:
+            self._prefix_min = x.copy()
+            self._prefix_max = x.copy()
+        else:
+            np.minimum(self._prefix_min, x, out=self._prefix_min)
+            np.maximum(self._prefix_max, x, out=self._prefix_max)
+
+        self._count += 1
+        if pos == self.window - 1:
+            # The ring now holds exactly one block, oldest frame first
+            self._resync()
+
+    def _resync(self):
+        ring = self._ring
+        self._suffix_min[:-1] = np.minimum.accumulate(ring[::-1], axis=0)[::-1]
+        self._suffix_max[:-1] = np.maximum.accumulate(ring[::-1], axis=0)[::-1]
+        self._mean = ring.mean(axis=0)
+        self._m2 = ((ring - self._mean) ** 2).sum(axis=0)
+        self._sum = ring.sum(axis=0)
+        self._k_weighted_sum = np.arange(self.window) @ ring
+        self._dft = np.fft.rfft(ring, axis=0)[self._bins]
+
+    @property
+    def features(self):
+        """
+        Current feature vector. The returned array is reused between calls.
+        """
+        n = min(self._count, self.window)
+        if n == 0:
+            self._features[:] = 0.0
+            return self._features.reshape(-1)
+
+        pos = (self._count - 1) % self.window
+        feats = self._features
+        feats[:, 0] = self._mean
+        feats[:, 1] = np.sqrt(np.maximum(self._m2, 0.0) / n)
+        feats[:, 2] = np.minimum(self._prefix_min, self._suffix_min[pos + 1])
+        feats[:, 3] = np.maximum(self._prefix_max, self._suffix_max[pos + 1])
+
+        k_sum, kk_sum = self._k_sum[n - 1], self._kk_sum[n - 1]
+        denom = n * kk_sum - k_sum**2
+        if denom > 0:
+            feats[:, 4] = (
+                (n * self._k_weighted_sum - k_sum * self._sum)
+                / denom
+                * self.sample_rate
+            )
+        else:
+            feats[:, 4] = 0.0
+
+        power = np.abs(self._dft) ** 2 * self._bin_scale
+        feats[:, 5:] = (self._band_masks @ power).T
+
+        return feats.reshape(-1)
@@ -0,0 +1,151 @@
+import numpy as np
+
+POLICIES = ("nearest", "linear", "hold")
+
+
+class StreamFusion:
+    """
+    Align several AnySkin streams onto a common timeline.
+
+    Samples from each stream are pushed in batches, in the same
+    [timestamp, data...] layout returned by AnySkinProcess.get_data and
+    get_buffer. Every pull returns the joint frames for all timeline points
+    that are ready, resampling each stream onto the timeline with one
+    vectorized lookup per stream. A timeline point is ready once every
+    stream has data up to it, or once it is more than max_lag behind the
+    newest sample of any stream; streams that lag further are held at their
+    last value.
+
+    Attributes
+    ----------
+    num_channels: list of int
+        Number of data channels (excluding the timestamp) of each stream
+    policy: str
+        Resampling policy; one of "nearest", "linear" or "hold"
+    rate: float
+        Rate of the common timeline in Hz. If None, the timestamps of the
+        first stream are used as the timeline
+    max_lag: float
+        Maximum time, in seconds, to wait for a lagging stream
+
+    Methods
+    -------
+    push(stream, samples):
+        Add a batch of samples from one of the streams
+    pull():
+        Return the time-aligned frames that are ready
+    """
+
+    def __init__(
+        self,
+        num_channels,
+        policy: str = "linear",
+        rate: float = None,
+        max_lag: float = 0.05,
+    ):
+        """Initializes a StreamFusion object."""
+        if policy not in POLICIES:
+            raise ValueError(
+                "Unknown policy {}; expected one of {}".format(policy, POLICIES)
+            )
+        self.num_channels = list(num_channels)
+        self.policy = policy
+        self.rate = rate
+        self.max_lag = max_lag
+
+        self._times = [np.empty((0,)) for _ in self.num_channels]
+        self._data = [np.empty((0, d)) for d in self.num_channels]
+        self._last_time = -np.inf
+        self._start_time = None
+        self._tick = 0
+
+    @property
+    def num_streams(self):
+        return len(self.num_channels)
+
+    def push(self, stream: int, samples):
+        """
+        Add a batch of samples from one of the streams
+
+        Parameters
+        ----------
+        stream : int
+            Index of the stream
+        samples : np.ndarray or list
+            (N, 1 + D) samples with the timestamp in the first column.
+            Timestamps must be increasing
+        """
+        samples = np.asarray(samples, dtype=float)
+        if samples.size == 0:
+            return
+        samples = samples.reshape(-1, 1 + self.num_channels[stream])
+        self._times[stream] = np.concatenate((self._times[stream], samples[:, 0]))
+        self._data[stream] = np.concatenate((self._data[stream], samples[:, 1:]))
+
+    def pull(self):
+        """
+        Return the time-aligned frames that are ready
+
+        Returns
+        -------
+        times : np.ndarray
+            (T,) timestamps of the common timeline
+        frames : np.ndarray
+            (T, sum D) joint frames with the streams' channels concatenated
+            in stream order
+        """
+        empty = (np.empty((0,)), np.empty((0, sum(self.num_channels))))
+        if any(len(t) == 0 for t in self._times):
+            return empty
+
+        if self._start_time is None:
+            self._start_time = max(t[0] for t in self._times)
+        latest = [t[-1] for t in self._times]
+        horizon = max(min(latest), max(latest) - self.max_lag)
+
+        if self.rate is None:
+            ref = self._times[0]
+            timeline = ref[
+                (ref > self._last_time) & (ref >= self._start_time) & (ref <= horizon)
+            ]
+        else:
+            last_tick = int(np.floor((horizon - self._start_time) * self.rate))
+            ticks = np.arange(self._tick, last_tick + 1)
+            timeline = self._start_time + ticks / self.rate
+            self._tick = max(self._tick, last_tick + 1)
+        if len(timeline) == 0:
+            return empty
+
+        frames = np.hstack(
+            [self._resample(s, timeline) for s in range(self.num_streams)]
+        )
+        self._last_time = timeline[-1]
+        self._discard_consumed()
+
+        return timeline, frames
+
+    def _resample(self, stream, timeline):
+        times, data = self._times[stream], self._data[stream]
+        prev = np.clip(np.searchsorted(times, timeline, side="right") - 1, 0, None)
+        nxt = np.minimum(prev + 1, len(times) - 1)
+        if self.policy == "hold":
+            return data[prev]
+
+        span = times[nxt] - times[prev]
+        weight = np.divide(
+            timeline - times[prev], span, out=np.zeros_like(timeline), where=span > 0
+        )
+        weight = np.clip(weight, 0.0, 1.0)
+        if self.policy == "nearest":
+            return data[np.where(weight > 0.5, nxt, prev)]
+        return data[prev] + weight[:, None] * (data[nxt] - data[prev])
+
+    def _discard_consumed(self):
+        # Keep the last sample at or before the last emitted time so that the
+        # next timeline point can still be interpolated
+        for s in range(self.num_streams):
+            keep = max(
+                0, np.searchsorted(self._times[s], self._last_time, side="right") - 1
+            )
+            self._times[s] = self._times[s][keep:]
+            self._data[s] = self._data[s][keep:]
@@ -0,0 +1,198 @@
+import numpy as np
+
+
+def _batch_moments(x, weights=None):
+    """Total weight, mean and co-moment matrix of a batch of frames."""
+    if weights is None:
+        n = float(len(x))
+        mean = x.mean(axis=0)
+        centered = x - mean
+        return n, mean, centered.T @ centered
+    n = weights.sum()
+    mean = weights @ x / n
+    centered = x - mean
+    return n, mean, (centered * weights[:, None]).T @ centered
+
+
+def _merge_moments(a, b):
+    """Chan et al. parallel update of two sets of moments."""
+    n_a, mean_a, com_a = a
+    n_b, mean_b, com_b = b
+    n = n_a + n_b
+    if n_a == 0:
+        return b
+    delta = mean_b - mean_a
+    mean = mean_a + delta * (n_b / n)
+    com = com_a + com_b + np.outer(delta, delta) * (n_a * n_b / n)
+    return n, mean, com
+
+
+def _remove_moments(total, part):
+    """Inverse of _merge_moments; removes part from total."""
+    n, mean, com = total
+    n_p, mean_p, com_p = part
+    n_r = n - n_p
+    mean_r = (n * mean - n_p * mean_p) / n_r
+    delta = mean_p - mean_r
+    com_r = com - com_p - np.outer(delta, delta) * (n_r * n_p / n)
+    return n_r, mean_r, com_r
+
+
+class InterferenceMonitor:
+    """
+    Running cross-covariance and correlation between two AnySkin boards.
+
+    Frames of both boards are concatenated as [board A, board B] (for
+    instance a 10-magnetometer stream from interference.py, or the output of
+    StreamFusion) and folded into running moments with the Chan et al.
+    parallel update, one batch at a time. With a sliding window, frames that
+    fall out of the window are removed with the inverse update and the
+    moments are recomputed from the ring buffer once per window to bound
+    round-off. With a half-life, older frames are down-weighted exponentially
+    instead.
+
+    Attributes
+    ----------
+    num_mags_a: int
+        Number of magnetometers on board A
+    num_mags_b: int
+        Number of magnetometers on board B
+    temp_filtered: bool
+        Flag indicating if frames exclude the temperature channels
+    window: int
+        Number of frames in the sliding window; ignored if halflife is set
+    halflife: float
+        Half-life, in frames, of the exponential window
+
+    Methods
+    -------
+    update(samples):
+        Add a batch of frames
+    cross_covariance:
+        (3 * num_mags_a, 3 * num_mags_b) covariance between the boards
+    correlation:
+        (3 * num_mags_a, 3 * num_mags_b) correlation between the boards
+    scores:
+        (num_mags_a, num_mags_b) interference score of every chip pair
+    """
+
+    def __init__(
+        self,
+        num_mags_a: int = 5,
+        num_mags_b: int = 5,
+        temp_filtered: bool = True,
+        window: int = 1000,
+        halflife: float = None,
+    ):
+        """Initializes an InterferenceMonitor object."""
+        self.num_mags_a = num_mags_a
+        self.num_mags_b = num_mags_b
+        self.temp_filtered = temp_filtered
+        self.window = window
+        self.halflife = halflife
+
+        num_mags = num_mags_a + num_mags_b
+        self._field_mask = np.ones((num_mags * (4 - temp_filtered),), dtype=bool)
+        if not temp_filtered:
+            self._field_mask[::4] = False
+        self._dim_a = 3 * num_mags_a
+        self._dim = 3 * num_mags
+        self._decay = None if halflife is None else 0.5 ** (1.0 / halflife)
+        self.reset()
+
+    def reset(self):
+        """Clear all accumulated statistics"""
+        self._moments = (0.0, np.zeros((self._dim,)), np.zeros((self._dim,) * 2))
+        self._ring = np.zeros((self.window, self._dim))
+        self._ring_pos = 0
+        self._since_resync = 0
+
+    @property
+    def count(self):
+        """Number of frames (or total weight) in the current window"""
+        return self._moments[0]
+
+    def update(self, samples):
+        """
+        Add a batch of frames
+
+        Parameters
+        ----------
+        samples : np.ndarray
+            (D,) frame or (N, D) frames of both boards, without timestamps
+        """
+        x = np.atleast_2d(np.asarray(samples, dtype=float))[:, self._field_mask]
+        if len(x) == 0:
+            return
+        if self._decay is not None:
+            self._update_exponential(x)
+        else:
+            self._update_sliding(x)
+
+    def _update_exponential(self, x):
+        weights = self._decay ** np.arange(len(x) - 1, -1, -1, dtype=float)
+        n, mean, com = self._moments
+        scale = self._decay ** len(x)
+        self._moments = _merge_moments(
+            (n * scale, mean, com * scale), _batch_moments(x, weights)
+        )
+
+    def _update_sliding(self, x):
+        if len(x) >= self.window:
+            self._ring[:] = x[-self.window :]
+            self._ring_pos = 0
+            self._resync(self.window)
+            return
+
+        n = int(self._moments[0])
+        num_removed = max(0, n + len(x) - self.window)
+        idx = (self._ring_pos + np.arange(len(x))) % self.window
+        removed = self._ring[idx[len(x) - num_removed :]]
+
+        moments = _merge_moments(self._moments, _batch_moments(x))
+        if num_removed > 0:
+            moments = _remove_moments(moments, _batch_moments(removed))
+        self._moments = moments
+        self._ring[idx] = x
+        self._ring_pos = (self._ring_pos + len(x)) % self.window
+
+        self._since_resync += len(x)
+        if self._since_resync >= self.window:
+            self._resync(n + len(x) - num_removed)
+
+    def _resync(self, n):
+        if n == self.window:
+            self._moments = _batch_moments(self._ring)
+        else:
+            self._moments = _batch_moments(self._ring[:n])
+        self._since_resync = 0
+
+    @property
+    def covariance(self):
+        """Full covariance matrix of both boards' channels"""
+        n, _, com = self._moments
+        if n == 0:
+            return np.zeros_like(com)
+        return com / n
+
+    @property
+    def cross_covariance(self):
+        return self.covariance[: self._dim_a, self._dim_a :]
+
+    @property
+    def correlation(self):
+        cov = self.covariance
+        std = np.sqrt(np.diag(cov))
+        cross = cov[: self._dim_a, self._dim_a :]
+        denom = np.outer(std[: self._dim_a], std[self._dim_a :])
+        return np.divide(cross, denom, out=np.zeros_like(cross), where=denom > 0)
+
+    @property
+    def scores(self):
+        """
+        Interference score of every chip pair: RMS of the 3x3 block of
+        correlations between the field axes of a chip on board A and a chip
+        on board B. 0 means uncorrelated, 1 means fully coupled.
+        """
+        corr = self.correlation.reshape(self.num_mags_a, 3, self.num_mags_b, 3)
+        return np.sqrt(np.mean(corr**2, axis=(1, 3)))
@@ -0,0 +1,242 @@
+import numpy as np
+
+
+class BoardLayout:
+    """
+    Geometry of an AnySkin board, or of a rig of several boards.
+
+    Chip positions are given in units of the board image width, with x to
+    the right and y down, matching the visualizers' display frame. Every
+    chip's in-plane rotation and per-axis signs are folded into one
+    precomputed (num_mags, 3, 3) rotation tensor, so that a whole batch of
+    raw field readings is mapped to the display frame with a single einsum.
+
+    Attributes
+    ----------
+    name: str
+        Name the layout is registered under
+    chip_positions: np.ndarray
+        (num_mags, 2) chip centers, in units of the board image width
+    chip_rotations: np.ndarray
+        (num_mags,) in-plane rotation of every chip's axes, in radians
+    axis_signs: np.ndarray
+        (num_mags, 3) sign applied to every chip axis before rotating
+    image: str
+        Background image in anyskin/visualizations/images, if any
+    board_ids: list
+        Board index of every chip, for rigs composed of several boards
+
+    Methods
+    -------
+    transform(data):
+        Map raw field readings of a batch of frames to the display frame
+    pixel_positions(width):
+        Chip centers in pixels for a display of the given width
+    place(offset=(0, 0), rotation=0.0, axis_signs=(1, 1, 1), name=None):
+        Copy of the layout moved, rotated or mirrored within a rig
+    to_dict(), from_dict(description):
+        Convert to and from a JSON-serializable description
+    """
+
+    def __init__(
+        self,
+        name: str,
+        chip_positions,
+        chip_rotations,
+        axis_signs=(1, 1, 1),
+        image: str = "viz_bg.png",
+        board_ids=None,
+    ):
+        """Initializes a BoardLayout object."""
+        self.name = name
+        self.chip_positions = np.asarray(chip_positions, dtype=float).reshape(-1, 2)
+        self.chip_rotations = np.asarray(chip_rotations, dtype=float).reshape(-1)
+        self.axis_signs = np.broadcast_to(
+            np.asarray(axis_signs, dtype=float), (self.num_mags, 3)
+        ).copy()
+        self.image = image
+        self.board_ids = [0] * self.num_mags if board_ids is None else list(board_ids)
+
+        cos, sin = np.cos(self.chip_rotations), np.sin(self.chip_rotations)
+        rotations = np.zeros((self.num_mags, 3, 3))
+        rotations[:, 0, 0], rotations[:, 0, 1] = cos, -sin
+        rotations[:, 1, 0], rotations[:, 1, 1] = sin, cos
+        rotations[:, 2, 2] = 1.0
+        self.rotations = rotations * self.axis_signs[:, None, :]
+
+    @property
+    def num_mags(self):
+        return len(self.chip_positions)
+
+    @property
+    def num_boards(self):
+        return len(set(self.board_ids))
+
+    def transform(self, data):
+        """
+        Map raw field readings of a batch of frames to the display frame
+
+        Parameters
+        ----------
+        data : np.ndarray
+            (3 * num_mags,), (N, 3 * num_mags) or (N, num_mags, 3) field
+            readings without timestamps or temperature
+
+        Returns
+        -------
+        np.ndarray
+            (N, num_mags, 3) field in the display frame
+        """
+        data = np.asarray(data, dtype=float).reshape(-1, self.num_mags, 3)
+        return np.einsum("mij,nmj->nmi", self.rotations, data)
+
+    def pixel_positions(self, width: float):
+        """Chip centers in pixels for a display of the given width"""
+        return self.chip_positions * width
+
+    def place(
+        self,
+        offset=(0.0, 0.0),
+        rotation=0.0,
+        axis_signs=(1, 1, 1),
+        name: str = None,
+    ):
+        """
+        Copy of the layout moved, rotated or mirrored within a rig
+
+        Parameters
+        ----------
+        offset : tuple
+            Translation of the chip positions, in units of the board width
+        rotation : float or np.ndarray
+            Extra in-plane rotation of the chips' axes, in radians; scalar or
+            one value per chip
+        axis_signs : tuple
+            Extra sign applied to every chip axis
+        name : str
+            Name of the copy; defaults to this layout's name
+        """
+        return BoardLayout(
+            self.name if name is None else name,
+            self.chip_positions + np.asarray(offset, dtype=float),
+            self.chip_rotations + rotation,
+            self.axis_signs * np.asarray(axis_signs, dtype=float),
+            self.image,
+            self.board_ids,
+        )
+
+    def to_dict(self):
+        """JSON-serializable description of the layout"""
+        return {
+            "name": self.name,
+            "chip_positions": self.chip_positions.tolist(),
+            "chip_rotations": self.chip_rotations.tolist(),
+            "axis_signs": self.axis_signs.tolist(),
+            "image": self.image,
+            "board_ids": self.board_ids,
+        }
+
+    @classmethod
+    def from_dict(cls, description):
+        """Layout from the output of to_dict"""
+        return cls(
+            description["name"],
+            description["chip_positions"],
+            description["chip_rotations"],
+            description["axis_signs"],
+            description["image"],
+            description["board_ids"],
+        )
+
+    def __repr__(self):
+        return "BoardLayout(name={!r}, num_mags={}, num_boards={})".format(
+            self.name, self.num_mags, self.num_boards
+        )
+
+
+def compose_layouts(name: str, layouts):
+    """
+    Compose several boards into one rig, in stream order
+
+    Parameters
+    ----------
+    name : str
+        Name of the rig
+    layouts : list of BoardLayout
+        Boards of the rig, already placed relative to each other
+
+    Returns
+    -------
+    BoardLayout
+        Layout of all chips of the rig, with board_ids numbering the boards
+    """
+    return BoardLayout(
+        name,
+        np.vstack([layout.chip_positions for layout in layouts]),
+        np.concatenate([layout.chip_rotations for layout in layouts]),
+        np.vstack([layout.axis_signs for layout in layouts]),
+        layouts[0].image,
+        [b for b, layout in enumerate(layouts) for _ in range(layout.num_mags)],
+    )
+
+
+LAYOUTS = {}
+
+
+def register_layout(layout: BoardLayout):
+    """Register a layout under its name, replacing any previous one"""
+    LAYOUTS[layout.name] = layout
+    return layout
+
+
+def get_layout(name: str):
+    """Look up a registered layout by name"""
+    try:
+        return LAYOUTS[name]
+    except KeyError:
+        raise KeyError(
+            "Unknown layout {}; registered layouts: {}".format(
+                name, ", ".join(sorted(LAYOUTS))
+            )
+        ) from None
+
+
+# Standard 5-magnetometer AnySkin board: center, left, right, up, down
+register_layout(
+    BoardLayout(
+        "anyskin",
+        np.array([[204, 222], [130, 222], [279, 222], [204, 157], [204, 290]]) / 400,
+        [-np.pi / 2, -np.pi / 2, np.pi, np.pi / 2, 0.0],
+    )
+)
+# Joystick boards, mounted rotated and upside down on the stick
+register_layout(
+    BoardLayout(
+        "joystick",
+        np.array([[414, 444], [264, 443], [556, 444], [410, 311], [414, 584]]) / 800,
+        [np.pi, np.pi, 5 * np.pi / 2, 2 * np.pi, 3 * np.pi / 2],
+        axis_signs=-1,
+    )
+)
+# ReSkin joystick: standard chip orientations with hand-tuned offsets
+register_layout(
+    BoardLayout(
+        "joystick_reskin",
+        get_layout("joystick").chip_positions,
+        get_layout("anyskin").chip_rotations + np.deg2rad([-135, -90, 90, 180, 0]),
+    )
+)
+# Two boards side by side, as streamed by interference.py
+register_layout(
+    compose_layouts(
+        "anyskin_pair",
+        [get_layout("anyskin"), get_layout("anyskin").place(offset=(1.0, 0.0))],
+    )
+)
+# Two stacked boards, as streamed by bislot.py; the second faces the first
+register_layout(
+    compose_layouts(
+        "anyskin_bislot",
+        [get_layout("anyskin"), get_layout("anyskin").place(axis_signs=(-1, 1, 1))],
+    )
+)
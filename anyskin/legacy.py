@@ -0,0 +1,177 @@
+import datetime
+import itertools
+import json
+import os
+import re
+
+import numpy as np
+
+from .recording import RECORDING_EXT
+
+# Legacy files in order of preference when a run was saved in several formats
+LEGACY_EXTS = (".csv", ".txt", ".npy", ".h5", ".json")
+
+_DATE = re.compile(r"(\d{4})[_-](\d{2})[_-](\d{2})")
+_TIME = re.compile(r"(?<!\d)(\d{2})[_-](\d{2})[_-](\d{2})(?!\d)")
+
+
+def channel_names(num_mags: int, temp_filtered: bool = True):
+    """Column names of a frame, e.g. Bx0, By0, Bz0 or T0, Bx0, By0, Bz0"""
+    axes = ("Bx", "By", "Bz") if temp_filtered else ("T", "Bx", "By", "Bz")
+    return ["{}{}".format(axis, mag) for mag in range(num_mags) for axis in axes]
+
+
+def recorded_at(path: str, mtime: float):
+    """
+    Recording date and time of a run
+
+    Parsed from datacollect.py (logs/2024_12_09/test_run_10_11_12) or
+    visualizer (data_2024-12-09_10-11-12) paths, falling back to the file's
+    modification time.
+
+    Returns
+    -------
+    date : str
+        YYYY-MM-DD date
+    timestamp : str
+        ISO 8601 date and time, or only the date if the path has no time
+    """
+    date = None
+    for match in _DATE.finditer(path):
+        date = match
+    if date is None:
+        stamp = datetime.datetime.fromtimestamp(mtime)
+        return stamp.strftime("%Y-%m-%d"), stamp.isoformat(timespec="seconds")
+    day = "-".join(date.groups())
+    clock = _TIME.search(path, date.end())
+    if clock is None:
+        return day, day
+    return day, "{}T{}".format(day, ":".join(clock.groups()))
+
+
+def infer_columns(rows):
+    """
+    Infer the layout of legacy recordings from their columns
+
+    Visualizer and datacollect.py dumps hold temperature-filtered frames, so a
+    column count divisible by 3 is read as 3 channels per magnetometer and one
+    divisible only by 4 as frames with temperature. A first column that holds
+    increasing epoch times in seconds is read as timestamps.
+
+    Parameters
+    ----------
+    rows : np.ndarray
+        (N, C) first rows of the recording
+
+    Returns
+    -------
+    has_timestamp : bool
+    num_mags : int
+    temp_filtered : bool
+    """
+    rows = np.atleast_2d(rows)
+    has_timestamp = bool(
+        rows.shape[1] > 1
+        and np.all(rows[:, 0] > 1e9)
+        and np.all(np.diff(rows[:, 0]) >= 0)
+    )
+    num_channels = rows.shape[1] - has_timestamp
+    if num_channels % 3 == 0:
+        return has_timestamp, num_channels // 3, True
+    if num_channels % 4 == 0:
+        return has_timestamp, num_channels // 4, False
+    raise ValueError(f"Cannot infer magnetometer count from {num_channels} channels")
+
+
+def _parse_lines(lines, delimiter):
+    return np.atleast_2d(np.loadtxt(lines, delimiter=delimiter, ndmin=2))
+
+
+def iter_blocks(path: str, block_rows: int = 100000):
+    """
+    Stream a legacy recording as blocks of rows
+
+    Text and CSV files are parsed block_rows lines at a time, .npy files are
+    memory-mapped, and .h5 and .json files, which datacollect.py only wrote
+    for short runs, are loaded whole.
+
+    Parameters
+    ----------
+    path : str
+        np.savetxt text, CSV, .npy, .h5 (requires h5py) or .json recording
+    block_rows : int
+        Number of rows per block
+
+    Yields
+    ------
+    np.ndarray
+        (N, C) float64 rows
+    """
+    ext = os.path.splitext(path)[1]
+    if ext in (".txt", ".csv"):
+        delimiter = "," if ext == ".csv" else None
+        with open(path) as f:
+            lines = (line for line in f if line.strip())
+            while True:
+                block = list(itertools.islice(lines, block_rows))
+                if not block:
+                    return
+                yield _parse_lines(block, delimiter)
+    elif ext == ".npy":
+        data = np.load(path, mmap_mode="r")
+        data = data.reshape(len(data), -1)
+        for start in range(0, len(data), block_rows):
+            yield np.asarray(data[start : start + block_rows], dtype=float)
+    elif ext == ".h5":
+        import h5py
+
+        with h5py.File(path, "r") as f:
+            data = f["data"]
+            for start in range(0, len(data), block_rows):
+                yield np.asarray(data[start : start + block_rows], dtype=float)
+    elif ext == ".json":
+        with open(path) as f:
+            data = np.array(json.load(f), dtype=float)
+        for start in range(0, len(data), block_rows):
+            yield data[start : start + block_rows]
+    else:
+        raise ValueError(f"Unsupported legacy recording {path}")
+
+
+def is_recording(filename: str):
+    """Whether a file name is that of a native or legacy AnySkin recording"""
+    stem, ext = os.path.splitext(filename)
+    if ext == RECORDING_EXT:
+        return True
+    if stem == "buffered_data":
+        return ext in LEGACY_EXTS
+    return stem.startswith("data_") and ext in (".txt", ".npy")
+
+
+def find_recordings(root: str):
+    """
+    Find recordings below a directory
+
+    Runs saved in several formats (datacollect.py's buffered_data.csv, .json
+    and .h5, or a recording converted to the native format) are returned once,
+    in their preferred format: native first, then LEGACY_EXTS order.
+
+    Returns
+    -------
+    list of str
+        Sorted paths of recordings
+    """
+    preference = (RECORDING_EXT,) + LEGACY_EXTS
+    found = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in filenames:
+            if not is_recording(filename):
+                continue
+            stem, ext = os.path.splitext(filename)
+            key = os.path.join(dirpath, stem)
+            if key not in found or preference.index(ext) < preference.index(
+                os.path.splitext(found[key])[1]
+            ):
+                found[key] = os.path.join(dirpath, filename)
+    return sorted(found.values())
@@ -0,0 +1,442 @@
+import json
+import os
+import struct
+import time
+
+import numpy as np
+
+from .layout import BoardLayout, LAYOUTS
+
+RECORDING_EXT = ".anyskin"
+FORMAT_VERSION = 1
+
+_FILE_MAGIC = b"ANYSKIN\x00"
+_FILE_HEADER = struct.Struct("<8sII")  # magic, version, metadata length
+_CHUNK_MAGIC = b"ASKC"
+_INDEX_MAGIC = b"ASKI"
+_CHUNK_HEADER = struct.Struct("<4sIQqq")  # magic, frames, payload bytes, t_first, t_last
+_TRAILER_MAGIC = b"ASKEND\x00\x00"
+_TRAILER = struct.Struct("<Q8s")  # index offset, magic
+
+DEFAULT_FIRMWARE = {"burst_mode": True, "baudrate": 115200, "floats_per_mag": 4}
+
+
+class RecordingWriter:
+    """
+    Writes AnySkin samples to the native chunked binary recording format.
+
+    A recording starts with a JSON header describing the sensor (number of
+    magnetometers, layout, firmware message format and sensor IDs), followed
+    by append-only chunks. Each chunk holds up to chunk_size frames as int64
+    nanosecond timestamps followed by float32 data, behind a fixed-size
+    header with its frame count, payload size and first and last timestamp.
+    On close, a per-chunk time index and a fixed-size trailer pointing at it
+    are appended, so that readers can seek by time without scanning.
+
+    Attributes
+    ----------
+    path: str
+        Path of the recording
+    num_mags: int
+        Number of magnetometers in every frame
+    temp_filtered: bool
+        Flag indicating if frames exclude the temperature channels
+    layout: BoardLayout or str
+        Layout of the recorded board(s), or the name of a registered layout
+    device_ids: list
+        Identifiers of the recorded sensor(s)
+    firmware: dict
+        Message format of the firmware the data was streamed with
+    metadata: dict
+        Any other JSON-serializable information to keep with the recording
+    chunk_size: int
+        Number of frames per chunk
+
+    Methods
+    -------
+    write(samples):
+        Append samples with timestamps in seconds, as returned by get_data
+    write_frames(times_ns, data):
+        Append frames with int64 nanosecond timestamps
+    flush():
+        Write out the pending partial chunk
+    close():
+        Write out pending frames, the time index and the trailer
+    """
+
+    def __init__(
+        self,
+        path: str,
+        num_mags: int = 5,
+        temp_filtered: bool = True,
+        layout=None,
+        device_ids=None,
+        firmware=None,
+        metadata=None,
+        chunk_size: int = 1000,
+    ):
+        """Initializes a RecordingWriter object."""
+        self.path = path
+        self.num_mags = num_mags
+        self.temp_filtered = temp_filtered
+        if isinstance(layout, str):
+            layout = LAYOUTS.get(layout, layout)
+        self.layout = layout
+        self.device_ids = [] if device_ids is None else list(device_ids)
+        self.firmware = dict(DEFAULT_FIRMWARE if firmware is None else firmware)
+        self.metadata = {} if metadata is None else dict(metadata)
+        self.chunk_size = chunk_size
+        self.num_channels = num_mags * (4 - temp_filtered)
+
+        self._times = np.zeros((chunk_size,), dtype=np.int64)
+        self._data = np.zeros((chunk_size, self.num_channels), dtype=np.float32)
+        self._pending = 0
+        self._index = []
+        self.num_frames = 0
+
+        dirname = os.path.dirname(path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+        self._file = open(path, "wb")
+        self._write_header()
+
+    def _write_header(self):
+        header = {
+            "num_mags": self.num_mags,
+            "temp_filtered": self.temp_filtered,
+            "num_channels": self.num_channels,
+            "layout": self.layout.to_dict()
+            if isinstance(self.layout, BoardLayout)
+            else self.layout,
+            "device_ids": self.device_ids,
+            "firmware": self.firmware,
+            "created": time.time(),
+            "metadata": self.metadata,
+        }
+        encoded = json.dumps(header).encode("utf-8")
+        # Pad so that chunks, and the arrays in them, start 8-byte aligned
+        encoded += b" " * (-len(encoded) % 8)
+        self._file.write(_FILE_HEADER.pack(_FILE_MAGIC, FORMAT_VERSION, len(encoded)))
+        self._file.write(encoded)
+
+    def write(self, samples):
+        """
+        Append samples with timestamps in seconds
+
+        Parameters
+        ----------
+        samples : np.ndarray
+            (1 + D,) sample or (N, 1 + D) samples as [timestamp, data...]
+        """
+        samples = np.atleast_2d(np.asarray(samples, dtype=float))
+        self.write_frames(
+            np.round(samples[:, 0] * 1e9).astype(np.int64), samples[:, 1:]
+        )
+
+    def write_frames(self, times_ns, data):
+        """
+        Append frames with nanosecond timestamps
+
+        Parameters
+        ----------
+        times_ns : np.ndarray
+            (N,) int64 timestamps in nanoseconds
+        data : np.ndarray
+            (N, D) frames without timestamps
+        """
+        times_ns = np.atleast_1d(np.asarray(times_ns, dtype=np.int64))
+        data = np.asarray(data).reshape(len(times_ns), self.num_channels)
+        start = 0
+        while start < len(times_ns):
+            count = min(self.chunk_size - self._pending, len(times_ns) - start)
+            end = self._pending + count
+            self._times[self._pending : end] = times_ns[start : start + count]
+            self._data[self._pending : end] = data[start : start + count]
+            self._pending = end
+            start += count
+            if self._pending == self.chunk_size:
+                self.flush()
+
+    def flush(self):
+        """Write out the pending partial chunk"""
+        n = self._pending
+        if n == 0:
+            return
+        times = self._times[:n]
+        offset = self._file.tell()
+        self._file.write(
+            _CHUNK_HEADER.pack(
+                _CHUNK_MAGIC,
+                n,
+                n * (8 + 4 * self.num_channels),
+                times[0],
+                times[-1],
+            )
+        )
+        self._file.write(times.tobytes())
+        self._file.write(self._data[:n].tobytes())
+        self._file.flush()
+        self._index.append((offset, self.num_frames, times[0], times[-1], n))
+        self.num_frames += n
+        self._pending = 0
+
+    def close(self):
+        """Write out pending frames, the time index and the trailer"""
+        if self._file.closed:
+            return
+        self.flush()
+        index = np.array(self._index, dtype=np.int64).reshape(-1, 5)
+        offset = self._file.tell()
+        t_first = index[0, 2] if len(index) else 0
+        t_last = index[-1, 3] if len(index) else 0
+        self._file.write(
+            _CHUNK_HEADER.pack(_INDEX_MAGIC, len(index), index.nbytes, t_first, t_last)
+        )
+        self._file.write(index.tobytes())
+        self._file.write(_TRAILER.pack(offset, _TRAILER_MAGIC))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class RecordingReader:
+    """
+    Reads recordings in the native chunked binary format.
+
+    The file is memory-mapped, so opening only parses the header and the
+    time index, whatever the size of the recording, and frames are paged in
+    by the OS as they are read. Seeking by time is a binary search over the
+    index followed by one within the chunk. Recordings that were not closed
+    cleanly have no index; their chunk headers are scanned instead and every
+    complete chunk is recovered.
+
+    Attributes
+    ----------
+    path: str
+        Path of the recording
+    header: dict
+        Recording header, as written by RecordingWriter
+    num_frames: int
+        Number of frames in the recording
+    num_channels: int
+        Number of data channels per frame
+
+    Methods
+    -------
+    read(start=0, stop=None):
+        Frames in [start, stop) as int64 ns timestamps and float32 data
+    samples(start=0, stop=None):
+        Frames in [start, stop) as [timestamp, data...] with seconds
+    index_at(t, relative=False, side="left"):
+        Index of the first frame recorded at or after time t
+    read_time(t_start, t_end):
+        Samples recorded in [t_start, t_end)
+    """
+
+    def __init__(self, path: str):
+        """Initializes a RecordingReader object."""
+        self.path = path
+        self._mmap = np.memmap(path, dtype=np.uint8, mode="r")
+        magic, self.version, header_len = _FILE_HEADER.unpack_from(self._mmap)
+        if magic != _FILE_MAGIC:
+            raise ValueError(f"{path} is not an AnySkin recording")
+        if self.version > FORMAT_VERSION:
+            raise ValueError(
+                f"{path} uses format version {self.version}; "
+                f"this reader supports up to {FORMAT_VERSION}"
+            )
+        self._data_start = _FILE_HEADER.size + header_len
+        self.header = json.loads(
+            self._mmap[_FILE_HEADER.size : self._data_start].tobytes().decode("utf-8")
+        )
+        self.num_channels = self.header["num_channels"]
+
+        index = self._read_index()
+        if index is None:
+            index = self._scan_chunks()
+        self._offsets = index[:, 0]
+        self._frame_starts = np.concatenate(([0], np.cumsum(index[:, 4])))
+        self._t_first = index[:, 2]
+        self._t_last = index[:, 3]
+        self.num_frames = int(self._frame_starts[-1])
+
+    def _read_index(self):
+        size = len(self._mmap)
+        if size < self._data_start + _CHUNK_HEADER.size + _TRAILER.size:
+            return None
+        offset, magic = _TRAILER.unpack_from(self._mmap, size - _TRAILER.size)
+        if magic != _TRAILER_MAGIC or offset >= size:
+            return None
+        magic, _, nbytes, _, _ = _CHUNK_HEADER.unpack_from(self._mmap, offset)
+        if magic != _INDEX_MAGIC:
+            return None
+        start = offset + _CHUNK_HEADER.size
+        return self._mmap[start : start + nbytes].view(np.int64).reshape(-1, 5)
+
+    def _scan_chunks(self):
+        """Rebuild the index of a recording that was not closed cleanly"""
+        index = []
+        num_frames = 0
+        offset = self._data_start
+        size = len(self._mmap)
+        while offset + _CHUNK_HEADER.size <= size:
+            magic, n, nbytes, t_first, t_last = _CHUNK_HEADER.unpack_from(
+                self._mmap, offset
+            )
+            end = offset + _CHUNK_HEADER.size + nbytes
+            if magic != _CHUNK_MAGIC or end > size:
+                break
+            index.append((offset, num_frames, t_first, t_last, n))
+            num_frames += n
+            offset = end
+        return np.array(index, dtype=np.int64).reshape(-1, 5)
+
+    @property
+    def num_mags(self):
+        return self.header["num_mags"]
+
+    @property
+    def temp_filtered(self):
+        return self.header["temp_filtered"]
+
+    @property
+    def device_ids(self):
+        return self.header["device_ids"]
+
+    @property
+    def firmware(self):
+        return self.header["firmware"]
+
+    @property
+    def metadata(self):
+        return self.header["metadata"]
+
+    @property
+    def layout(self):
+        """Recorded layout; a registered layout of the same name if stored by name"""
+        layout = self.header["layout"]
+        if isinstance(layout, dict):
+            return BoardLayout.from_dict(layout)
+        return LAYOUTS.get(layout, layout)
+
+    @property
+    def start_time(self):
+        """Timestamp of the first frame, in seconds"""
+        return self._t_first[0] / 1e9 if len(self._t_first) else None
+
+    @property
+    def end_time(self):
+        """Timestamp of the last frame, in seconds"""
+        return self._t_last[-1] / 1e9 if len(self._t_last) else None
+
+    @property
+    def duration(self):
+        if self.num_frames == 0:
+            return 0.0
+        return (self._t_last[-1] - self._t_first[0]) / 1e9
+
+    def __len__(self):
+        return self.num_frames
+
+    def _read_chunk(self, chunk):
+        """Zero-copy views of a chunk's timestamps and frames"""
+        n = int(self._frame_starts[chunk + 1] - self._frame_starts[chunk])
+        start = int(self._offsets[chunk]) + _CHUNK_HEADER.size
+        times = self._mmap[start : start + 8 * n].view(np.int64)
+        start += 8 * n
+        data = self._mmap[start : start + 4 * n * self.num_channels].view(np.float32)
+        return times, data.reshape(n, self.num_channels)
+
+    def read(self, start: int = 0, stop: int = None):
+        """
+        Frames in [start, stop)
+
+        Returns
+        -------
+        times_ns : np.ndarray
+            (N,) int64 timestamps in nanoseconds
+        data : np.ndarray
+            (N, D) float32 frames
+        """
+        start, stop, _ = slice(start, stop).indices(self.num_frames)
+        stop = max(start, stop)
+        times = np.empty((stop - start,), dtype=np.int64)
+        data = np.empty((stop - start, self.num_channels), dtype=np.float32)
+        first = np.searchsorted(self._frame_starts, start, side="right") - 1
+        last = np.searchsorted(self._frame_starts, stop, side="left")
+        for chunk in range(max(first, 0), last):
+            chunk_start = self._frame_starts[chunk]
+            chunk_times, chunk_data = self._read_chunk(chunk)
+            lo = max(start - chunk_start, 0)
+            hi = min(stop - chunk_start, len(chunk_times))
+            out = slice(chunk_start + lo - start, chunk_start + hi - start)
+            times[out] = chunk_times[lo:hi]
+            data[out] = chunk_data[lo:hi]
+        return times, data
+
+    def samples(self, start: int = 0, stop: int = None):
+        """Frames in [start, stop) as (N, 1 + D) [timestamp, data...] in seconds"""
+        times, data = self.read(start, stop)
+        return np.hstack((times[:, None] / 1e9, data))
+
+    def index_at(self, t: float, relative: bool = False, side: str = "left"):
+        """
+        Index of the first frame recorded at or after time t
+
+        Parameters
+        ----------
+        t : float
+            Timestamp in seconds, on the same clock as the samples
+        relative : bool
+            Flag indicating if t is in seconds from the first frame
+        side : str
+            "left" for the first frame at or after t, "right" for the first
+            frame strictly after t
+        """
+        t_ns = int(round(t * 1e9))
+        if relative and len(self._t_first):
+            t_ns += int(self._t_first[0])
+        chunk = np.searchsorted(self._t_last, t_ns, side=side)
+        if chunk >= len(self._t_last):
+            return self.num_frames
+        times, _ = self._read_chunk(chunk)
+        return int(self._frame_starts[chunk] + np.searchsorted(times, t_ns, side=side))
+
+    def read_time(self, t_start: float, t_end: float):
+        """Samples recorded in [t_start, t_end), timestamps in seconds"""
+        return self.samples(self.index_at(t_start), self.index_at(t_end))
+
+    def close(self):
+        self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_data(path: str):
+    """
+    Load the frames of a recording, without timestamps
+
+    Parameters
+    ----------
+    path : str
+        Native recording, or a legacy np.savetxt text file or .npy array
+
+    Returns
+    -------
+    np.ndarray
+        (N, D) frames
+    """
+    if path.endswith(RECORDING_EXT):
+        with RecordingReader(path) as reader:
+            return reader.read()[1]
+    if path.endswith(".npy"):
+        return np.load(path)
+    return np.loadtxt(path)
@@ -0,0 +1,195 @@
+import time
+
+import numpy as np
+
+from .recording import RECORDING_EXT, RecordingReader, load_data
+
+
+class Replay:
+    """
+    Plays back a recording against the wall clock.
+
+    Native recordings are memory-mapped, so playback starts immediately
+    regardless of the size of the recording, and the frame shown at any time
+    is the one whose timestamp matches the elapsed playback time. Playback
+    can run at any speed, be paused and stepped frame by frame, and seek to
+    any point. Legacy recordings without timestamps are loaded in full and
+    assumed to be sampled at a fixed rate.
+
+    Attributes
+    ----------
+    source: str or RecordingReader
+        Recording to play back, or path to one (native, .npy or text)
+    speed: float
+        Playback speed relative to real time
+    loop: bool
+        Flag to restart from the beginning at the end of the recording
+    rate: float
+        Sample rate, in Hz, assumed for recordings without timestamps
+
+    Methods
+    -------
+    get_frame():
+        Frame at the current playback time
+    get_new_samples():
+        All samples played since the last call, with timestamps
+    play(), pause(), toggle_pause():
+        Start and stop the playback clock
+    seek(position):
+        Jump to a time, in seconds from the start of the recording
+    step(frames=1):
+        Pause and move by a number of frames
+    skip(direction):
+        Step one frame if paused, otherwise seek one second
+    """
+
+    def __init__(
+        self,
+        source,
+        speed: float = 1.0,
+        loop: bool = False,
+        rate: float = 100.0,
+    ):
+        """Initializes a Replay object."""
+        if isinstance(source, str):
+            if source.endswith(RECORDING_EXT):
+                source = RecordingReader(source)
+            else:
+                source = load_data(source)
+        if isinstance(source, RecordingReader):
+            self.reader = source
+            self._data = None
+            self.num_frames = len(source)
+            self.duration = source.duration
+            self._start_ns = source.read(0, 1)[0][0] if len(source) else 0
+        else:
+            self.reader = None
+            self._data = np.atleast_2d(source)
+            self.num_frames = len(self._data)
+            self.duration = max(self.num_frames - 1, 0) / rate
+        self.rate = rate
+        self.loop = loop
+        self._speed = speed
+        self._paused = False
+        self._anchor_position = 0.0
+        self._anchor_wall = time.monotonic()
+        self._last_index = 0
+
+    @property
+    def speed(self):
+        return self._speed
+
+    @speed.setter
+    def speed(self, speed: float):
+        self._reanchor(self.position)
+        self._speed = speed
+
+    @property
+    def paused(self):
+        return self._paused
+
+    @property
+    def position(self):
+        """Playback time, in seconds from the start of the recording"""
+        if self._paused:
+            return self._anchor_position
+        elapsed = (time.monotonic() - self._anchor_wall) * self._speed
+        position = self._anchor_position + elapsed
+        if self.loop and self.duration > 0:
+            return position % self.duration
+        return min(position, self.duration)
+
+    @property
+    def finished(self):
+        return not self.loop and self.position >= self.duration
+
+    def _reanchor(self, position):
+        self._anchor_position = min(max(position, 0.0), self.duration)
+        self._anchor_wall = time.monotonic()
+
+    def _index_at(self, position):
+        """Index of the last frame recorded at or before the playback time"""
+        if self.num_frames == 0:
+            return 0
+        if self.reader is None:
+            index = int(position * self.rate + 1e-9)
+        else:
+            index = self.reader.index_at(position, relative=True, side="right") - 1
+        return min(max(index, 0), self.num_frames - 1)
+
+    def _position_of(self, index):
+        """Playback time of a frame"""
+        if self.reader is None:
+            return index / self.rate
+        times, _ = self.reader.read(index, index + 1)
+        return (times[0] - self._start_ns) / 1e9
+
+    def _frames(self, start, stop):
+        if self.reader is not None:
+            return self.reader.samples(start, stop)
+        times = np.arange(start, stop)[:, None] / self.rate
+        return np.hstack((times, self._data[start:stop]))
+
+    def play(self):
+        if self._paused:
+            self._paused = False
+            self._anchor_wall = time.monotonic()
+
+    def pause(self):
+        if not self._paused:
+            self._reanchor(self.position)
+            self._paused = True
+
+    def toggle_pause(self):
+        if self._paused:
+            self.play()
+        else:
+            self.pause()
+
+    def seek(self, position: float):
+        """Jump to a time, in seconds from the start of the recording"""
+        self._reanchor(position)
+        self._last_index = self._index_at(self._anchor_position)
+
+    def step(self, frames: int = 1):
+        """Pause and move by a number of frames"""
+        self.pause()
+        index = self._index_at(self.position) + frames
+        index = min(max(index, 0), self.num_frames - 1)
+        self._anchor_position = self._position_of(index)
+
+    def skip(self, direction: int):
+        """Step one frame if paused, otherwise seek one second"""
+        if self._paused:
+            self.step(direction)
+        else:
+            self.seek(self.position + direction)
+
+    def get_frame(self):
+        """
+        Frame at the current playback time
+
+        Returns
+        -------
+        np.ndarray
+            (D,) frame without timestamp
+        """
+        index = self._index_at(self.position)
+        return self._frames(index, index + 1)[0, 1:]
+
+    def get_new_samples(self):
+        """
+        All samples played since the last call
+
+        Returns
+        -------
+        np.ndarray
+            (N, 1 + D) samples as [timestamp, data...], timestamps in seconds
+        """
+        index = self._index_at(self.position) + 1
+        if index < self._last_index:
+            # Looped or stepped backwards
+            self._last_index = index - 1
+        samples = self._frames(self._last_index, index)
+        self._last_index = index
+        return samples
@@ -4,6 +4,8 @@ import time
 import numpy as np
 import serial
 
+from .recording import RecordingReader
+
 
 class AnySkinBase(serial.Serial):
     """
@@ -159,6 +161,127 @@ class AnySkinDummy(AnySkinBase):
     def get_sample(self):
         collect_start = time.time()
         data = np.random.uniform(-1.0, 1.0, size=(np.sum(self._temp_mask),))
-        acq_delay = time.time() - collect_start
 
-        return collect_start, acq_delay, data
+        return collect_start, data
+
+
+class AnySkinReplay(AnySkinBase):
+    """
+    Replays a recording in place of a serial sensor.
+
+    Samples are returned at the recorded timing scaled by speed, or as fast
+    as possible if speed is None. Returned timestamps keep the recorded
+    spacing, shifted to start when the replay starts, so that time constants
+    downstream behave the same at any speed. Frames are read from the
+    memory-mapped recording a block at a time.
+
+    Attributes
+    ----------
+    replay_file: str
+        Path of the native recording to replay
+    num_mags: int
+        Number of magnetometers; taken from the recording if None
+    temp_filtered: bool
+        Flag indicating if temperature readings should be filtered from
+        the output
+    speed: float
+        Playback speed relative to the recorded timing; None to replay as
+        fast as possible
+    loop: bool
+        Flag to restart from the beginning at the end of the recording
+
+    Methods
+    -------
+    get_sample()
+        Next recorded sample; raises EOFError at the end of the recording
+    """
+
+    def __init__(
+        self,
+        replay_file: str,
+        num_mags: int = None,
+        temp_filtered: bool = True,
+        speed: float = 1.0,
+        loop: bool = False,
+        device_id: int = -1,
+        block_size: int = 4096,
+    ):
+        """Initializes a AnySkinReplay object."""
+        self.reader = RecordingReader(replay_file)
+        if num_mags is None:
+            num_mags = self.reader.num_mags
+        if num_mags != self.reader.num_mags:
+            raise ValueError(
+                f"{replay_file} has {self.reader.num_mags} magnetometers, "
+                f"not {num_mags}"
+            )
+        if self.reader.temp_filtered and not temp_filtered:
+            raise ValueError(f"{replay_file} was recorded without temperature")
+        if len(self.reader) == 0:
+            raise ValueError(f"{replay_file} has no frames")
+
+        self.num_mags = num_mags
+        self.port_name = replay_file
+        self.replay_file = replay_file
+        self.device_id = device_id
+        self.speed = speed
+        self.loop = loop
+        self.block_size = block_size
+
+        self._temp_mask = np.ones((self.reader.num_channels,), dtype=bool)
+        if temp_filtered and not self.reader.temp_filtered:
+            self._temp_mask[::4] = False
+
+        times, _ = self.reader.read(0, 1)
+        self._first_ns = times[0]
+        # Recorded time that maps onto the start of the replay
+        self._origin_ns = self._first_ns
+        self._start_time = None
+        self._start_wall = None
+        self._next = 0
+        self._block_start = 0
+        self._times = times[:0]
+        self._data = None
+
+    def _initialize(self):
+        pass
+
+    def get_sample(self):
+        """
+        Next recorded sample, once it is due
+
+        Returns
+        -------
+        sample_time : float
+            Replay timestamp of the sample, in seconds
+        sample : np.ndarray
+            Recorded sample
+        """
+        if self._start_time is None:
+            self._start_time = time.time()
+            self._start_wall = time.monotonic()
+
+        pos = self._next - self._block_start
+        if pos >= len(self._times):
+            if self._next >= len(self.reader):
+                if not self.loop:
+                    raise EOFError(f"End of {self.replay_file}")
+                # Continue one frame period after the last frame
+                last_ns = self._times[-1]
+                period = (last_ns - self._first_ns) // max(len(self.reader) - 1, 1)
+                self._origin_ns -= last_ns + period - self._first_ns
+                self._next = 0
+            self._block_start = self._next
+            self._times, self._data = self.reader.read(
+                self._next, self._next + self.block_size
+            )
+            pos = 0
+        self._next += 1
+
+        offset = (self._times[pos] - self._origin_ns) / 1e9
+        if self.speed is not None:
+            delay = self._start_wall + offset / self.speed - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        sample = self._data[pos][self._temp_mask].astype(float)
+        return self._start_time + offset, sample
@@ -1,12 +1,17 @@
 import atexit
 import ctypes as ct
+import queue
 import sys
-from multiprocessing import Process, Event, Pipe, Value, Array
+import threading
+from multiprocessing import Process, Event, Pipe, Queue, Value, Array
 
 import numpy as np
 import serial
 
-from .sensor import AnySkinBase, AnySkinDummy
+from .baseline import BaselineTracker
+from .contact import ContactDetector
+from .sensor import AnySkinBase, AnySkinDummy, AnySkinReplay
+from .temperature import TemperatureCalibration, TemperatureCompensator
 
 
 class AnySkinProcess(Process):
@@ -33,6 +38,29 @@ class AnySkinProcess(Process):
         configurations is unavailable
     chunk_size : int
         Quantum of data piped from buffer at one time.
+    baseline_alpha: float
+        Smoothing factor of the drift-tracking baseline
+    contact_threshold: float or np.ndarray
+        Deviation norm of a chip's field above which a chip is in contact;
+        baseline tracking is frozen during contact. Scalar or one per chip
+    contact_hysteresis: float
+        Fraction of contact_threshold below which a chip is released
+    contact_debounce: int
+        Number of consecutive frames required to confirm a contact transition
+    temperature_calibration: TemperatureCalibration or str
+        Drift model (or path to a saved one) used to remove temperature drift
+        from every sample. Temperature is read from the sensor regardless of
+        temp_filtered
+    temp_decimation: int
+        Number of frames between temperature reads for drift compensation
+    replay_file: str
+        Native recording to replay in place of the serial sensor
+    replay_speed: float
+        Replay speed relative to the recorded timing; None to replay as fast
+        as possible
+    replay_loop: bool
+        Flag to restart the replay at the end of the recording; otherwise
+        streaming stops there
 
     Methods
     -------
@@ -44,10 +72,18 @@ class AnySkinProcess(Process):
         Stop buffering AnySkin data
     pause_streaming():
         Stop streaming data from AnySkin sensor
-    get_data(num_samples=5):
+    rebaseline():
+        Re-seed the drift-tracking baseline from upcoming samples
+    get_contact_events():
+        Return contact events detected since the last call
+    add_contact_callback(callback):
+        Call a function on every contact event
+    get_data(num_samples=5, subtract_baseline=False):
         Return a specified number of samples from the AnySkin Sensor
     get_buffer(timeout=1.0, pause_if_buffering=False):
         Return the recorded buffer
+    wait_replay_finished(timeout=None):
+        Wait until the end of the replayed recording
     """
 
     def __init__(
@@ -58,6 +94,15 @@ class AnySkinProcess(Process):
         temp_filtered: bool = True,
         burst_mode: bool = True,
         baudrate: int = 115200,
+        baseline_alpha: float = 0.001,
+        contact_threshold=50.0,
+        contact_hysteresis: float = 0.5,
+        contact_debounce: int = 2,
+        temperature_calibration=None,
+        temp_decimation: int = 100,
+        replay_file: str = None,
+        replay_speed: float = 1.0,
+        replay_loop: bool = False,
     ):
         """Initializes a AnySkinProcess object."""
         super(AnySkinProcess, self).__init__()
@@ -67,6 +112,19 @@ class AnySkinProcess(Process):
         self.burst_mode = burst_mode
         self.device_id = device_id
         self.temp_filtered = temp_filtered
+        self.baseline_alpha = baseline_alpha
+        self.contact_threshold = contact_threshold
+        self.contact_hysteresis = contact_hysteresis
+        self.contact_debounce = contact_debounce
+        if isinstance(temperature_calibration, str):
+            temperature_calibration = TemperatureCalibration.load(
+                temperature_calibration
+            )
+        self.temperature_calibration = temperature_calibration
+        self.temp_decimation = temp_decimation
+        self.replay_file = replay_file
+        self.replay_speed = replay_speed
+        self.replay_loop = replay_loop
 
         self._pipe_in, self._pipe_out = Pipe()
         self._sample_cnt = Value(ct.c_uint64)
@@ -74,6 +132,15 @@ class AnySkinProcess(Process):
 
         self._last_time = Value(ct.c_double)
         self._last_reading = Array(ct.c_float, self.num_mags * (4 - temp_filtered))
+        self._last_delta = Array(ct.c_float, self.num_mags * (4 - temp_filtered))
+        self._baseline = Array(ct.c_float, self.num_mags * (4 - temp_filtered))
+        self._in_contact = Array(ct.c_bool, self.num_mags)
+        self._temperature = Array(ct.c_float, self.num_mags)
+
+        # Contact events are dropped if nobody consumes them
+        self._contact_queue = Queue(maxsize=1000)
+        self._contact_callbacks = []
+        self._contact_thread = None
 
         self.allow_dummy_sensor = False
         # Size of chunks piped through buffer
@@ -84,6 +151,8 @@ class AnySkinProcess(Process):
         self._event_sending_data = Event()
 
         self._event_is_buffering = Event()
+        self._event_rebaseline = Event()
+        self._event_replay_finished = Event()
 
         atexit.register(self.join)
 
@@ -96,6 +165,28 @@ class AnySkinProcess(Process):
             )
         )
 
+    @property
+    def last_delta(self):
+        return np.concatenate(
+            (
+                [self._last_time.value],
+                self._last_delta[:],
+            )
+        )
+
+    @property
+    def baseline(self):
+        return np.array(self._baseline[:])
+
+    @property
+    def in_contact(self):
+        return np.array(self._in_contact[:])
+
+    @property
+    def temperature(self):
+        """Chip temperatures last read for drift compensation"""
+        return np.array(self._temperature[:])
+
     @property
     def sample_cnt(self):
         return self._sample_cnt.value
@@ -135,7 +226,49 @@ class AnySkinProcess(Process):
         """Stop streaming data from AnySkin sensor"""
         self._event_is_streaming.clear()
 
-    def get_data(self, num_samples=5):
+    def rebaseline(self):
+        """Re-seed the drift-tracking baseline from upcoming samples"""
+        self._event_rebaseline.set()
+
+    def get_contact_events(self):
+        """
+        Return contact events detected since the last call. Events are
+        delivered to callbacks instead once a callback has been added.
+        """
+        events = []
+        while True:
+            try:
+                events.append(self._contact_queue.get_nowait())
+            except queue.Empty:
+                return events
+
+    def add_contact_callback(self, callback):
+        """
+        Call a function on every contact event. Must be called after the
+        process has been started.
+
+        Parameters
+        ----------
+        callback : callable
+            Called with a ContactEvent from a background thread
+        """
+        self._contact_callbacks.append(callback)
+        if self._contact_thread is None:
+            self._contact_thread = threading.Thread(
+                target=self._dispatch_contact_events, daemon=True
+            )
+            self._contact_thread.start()
+
+    def _dispatch_contact_events(self):
+        while not self._event_quit_request.is_set():
+            try:
+                event = self._contact_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            for callback in self._contact_callbacks:
+                callback(event)
+
+    def get_data(self, num_samples=5, subtract_baseline=False):
         """
         Return a specified number of samples from the AnySkin Sensor
 
@@ -143,14 +276,17 @@ class AnySkinProcess(Process):
         ----------
         num_samples : int
             Number of samples required
+        subtract_baseline : bool
+            Returns samples with the drift-tracking baseline subtracted if true
         """
         # Only sends samples if streaming is on. Sends empty list otherwise.
 
         samples = []
         if num_samples <= 0:
             return samples
+        reading = "last_delta" if subtract_baseline else "last_reading"
         last_cnt = self._sample_cnt.value
-        samples = [self.last_reading]
+        samples = [getattr(self, reading)]
         while len(samples) < num_samples:
             if not self._event_is_streaming.is_set():
                 print("Please start streaming first.")
@@ -159,7 +295,7 @@ class AnySkinProcess(Process):
             if last_cnt == self._sample_cnt.value:
                 continue
             last_cnt = self._sample_cnt.value
-            samples.append(self.last_reading)
+            samples.append(getattr(self, reading))
 
         return samples
 
@@ -195,6 +331,22 @@ class AnySkinProcess(Process):
 
         return rtn
 
+    def wait_replay_finished(self, timeout: float = None):
+        """
+        Wait until the end of the replayed recording
+
+        Parameters
+        ----------
+        timeout : float
+            Maximum time to wait, in seconds
+
+        Returns
+        -------
+        bool
+            True if the replay finished, False on timeout
+        """
+        return self._event_replay_finished.wait(timeout)
+
     def join(self, timeout=None):
         """Clean up before exiting"""
         self._event_quit_request.set()
@@ -206,16 +358,36 @@ class AnySkinProcess(Process):
     def run(self):
         """This loop runs until it's asked to quit."""
         buffer = []
-        # Initialize sensor
-        try:
-            self.sensor = AnySkinBase(
-                num_mags=self.num_mags,
-                port=self.port,
-                baudrate=self.baudrate,
-                burst_mode=self.burst_mode,
-                device_id=self.device_id,
+        temp_compensator = None
+        # Temperature must be read from the sensor to compensate for it
+        sensor_temp_filtered = self.temp_filtered
+        if self.temperature_calibration is not None:
+            temp_compensator = TemperatureCompensator(
+                self.temperature_calibration,
                 temp_filtered=self.temp_filtered,
+                decimation=self.temp_decimation,
             )
+            sensor_temp_filtered = False
+        # Initialize sensor
+        try:
+            if self.replay_file is not None:
+                self.sensor = AnySkinReplay(
+                    self.replay_file,
+                    num_mags=self.num_mags,
+                    temp_filtered=sensor_temp_filtered,
+                    speed=self.replay_speed,
+                    loop=self.replay_loop,
+                    device_id=self.device_id,
+                )
+            else:
+                self.sensor = AnySkinBase(
+                    num_mags=self.num_mags,
+                    port=self.port,
+                    baudrate=self.baudrate,
+                    burst_mode=self.burst_mode,
+                    device_id=self.device_id,
+                    temp_filtered=sensor_temp_filtered,
+                )
             # self.sensor._initialize()
             self.start_streaming()
         except (serial.serialutil.SerialException, AttributeError) as e:
@@ -228,12 +400,25 @@ class AnySkinProcess(Process):
                     baudrate=self.baudrate,
                     burst_mode=self.burst_mode,
                     device_id=self.device_id,
-                    temp_filtered=self.temp_filtered,
+                    temp_filtered=sensor_temp_filtered,
                 )
                 self.start_streaming()
             else:
                 sys.exit(-1)
 
+        baseline_tracker = BaselineTracker(
+            num_mags=self.num_mags,
+            temp_filtered=self.temp_filtered,
+            alpha=self.baseline_alpha,
+            contact_threshold=self.contact_threshold,
+        )
+        contact_detector = ContactDetector(
+            num_mags=self.num_mags,
+            temp_filtered=self.temp_filtered,
+            on_threshold=self.contact_threshold,
+            off_threshold=np.multiply(self.contact_threshold, self.contact_hysteresis),
+            debounce=self.contact_debounce,
+        )
         is_streaming = False
         while not self._event_quit_request.is_set():
             if self._event_is_streaming.is_set():
@@ -241,10 +426,33 @@ class AnySkinProcess(Process):
                     is_streaming = True
                     # Any logging or stuff you want to do when streaming has
                     # just started should go here
-                (
-                    self._last_time.value,
-                    self._last_reading[:],
-                ) = self.sensor.get_sample()
+                try:
+                    sample_time, sample = self.sensor.get_sample()
+                except EOFError:
+                    print("Replay finished")
+                    self.pause_streaming()
+                    self._event_replay_finished.set()
+                    continue
+                if temp_compensator is not None:
+                    sample = temp_compensator.update(sample)
+                    self._temperature[:] = temp_compensator.temperature
+                self._last_time.value = sample_time
+                self._last_reading[:] = sample
+
+                if self._event_rebaseline.is_set():
+                    self._event_rebaseline.clear()
+                    baseline_tracker.rebaseline()
+                self._last_delta[:] = baseline_tracker.update(self._last_reading[:])
+                self._baseline[:] = baseline_tracker.baseline
+
+                for event in contact_detector.update(
+                    self._last_time.value, self._last_delta[:]
+                ):
+                    try:
+                        self._contact_queue.put_nowait(event)
+                    except queue.Full:
+                        pass
+                self._in_contact[:] = contact_detector.in_contact
 
                 self._sample_cnt.value += 1
 
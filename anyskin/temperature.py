@@ -0,0 +1,253 @@
+import argparse
+
+import numpy as np
+
+
+class TemperatureCalibration:
+    """
+    Polynomial model of each field channel's drift against chip temperature.
+
+    For every magnetometer, the three field channels are fitted as a
+    polynomial in that chip's (centered) temperature reading. Normal
+    equations are accumulated batch by batch, so recordings of any length can
+    be streamed through partial_fit, and all chips are solved at once with a
+    batched solve.
+
+    Attributes
+    ----------
+    num_mags: int
+        Number of magnetometers on the sensor
+    degree: int
+        Degree of the drift polynomial
+    reference_temperature: np.ndarray
+        (num_mags,) temperature at which the drift is defined to be zero
+    coefficients: np.ndarray
+        (num_mags, degree + 1, 3) polynomial coefficients, lowest order first
+
+    Methods
+    -------
+    partial_fit(samples):
+        Accumulate a batch of raw samples that include temperature
+    fit(samples=None):
+        Solve for the drift coefficients
+    drift(temperatures):
+        Evaluate the drift of every field channel at the given temperatures
+    save(path), load(path):
+        Store and retrieve a calibration
+    """
+
+    def __init__(self, num_mags: int = 1, degree: int = 2):
+        """Initializes a TemperatureCalibration object."""
+        self.num_mags = num_mags
+        self.degree = degree
+        self.reference_temperature = None
+        self.coefficients = np.zeros((num_mags, degree + 1, 3))
+
+        self._gram = np.zeros((num_mags, degree + 1, degree + 1))
+        self._moment = np.zeros((num_mags, degree + 1, 3))
+        self._count = 0
+
+    def _powers(self, temperatures):
+        """(N, num_mags, degree + 1) powers of the centered temperatures."""
+        centered = np.asarray(temperatures, dtype=float) - self.reference_temperature
+        return centered[..., None] ** np.arange(self.degree + 1)
+
+    def partial_fit(self, samples):
+        """
+        Accumulate a batch of raw samples that include temperature
+
+        Parameters
+        ----------
+        samples : np.ndarray
+            (N, 4 * num_mags) samples without timestamps, recorded with
+            temp_filtered=False
+        """
+        samples = np.atleast_2d(np.asarray(samples, dtype=float))
+        frames = samples.reshape(len(samples), self.num_mags, 4)
+        if self.reference_temperature is None:
+            self.reference_temperature = frames[:, :, 0].mean(axis=0)
+
+        powers = self._powers(frames[:, :, 0])
+        self._gram += np.einsum("nmi,nmj->mij", powers, powers)
+        self._moment += np.einsum("nmi,nmc->mic", powers, frames[:, :, 1:])
+        self._count += len(samples)
+        return self
+
+    def fit(self, samples=None):
+        """
+        Solve for the drift coefficients
+
+        Parameters
+        ----------
+        samples : np.ndarray
+            Optional last batch of samples to accumulate before solving
+        """
+        if samples is not None:
+            self.partial_fit(samples)
+        if self._count == 0:
+            raise ValueError("No samples to fit temperature drift to")
+        # A small ridge keeps the solve stable when a chip barely changed
+        # temperature during the recording
+        ridge = 1e-9 * np.trace(self._gram, axis1=1, axis2=2)[:, None, None]
+        self.coefficients = np.linalg.solve(
+            self._gram + ridge * np.eye(self.degree + 1), self._moment
+        )
+        return self
+
+    def drift(self, temperatures):
+        """
+        Evaluate the temperature-induced drift of every field channel
+
+        Parameters
+        ----------
+        temperatures : np.ndarray
+            (num_mags,) or (N, num_mags) chip temperatures
+
+        Returns
+        -------
+        np.ndarray
+            (..., 3 * num_mags) drift relative to the reference temperature
+        """
+        powers = self._powers(temperatures)[..., 1:]
+        drift = np.einsum("...mi,mic->...mc", powers, self.coefficients[:, 1:])
+        return drift.reshape(drift.shape[:-2] + (3 * self.num_mags,))
+
+    def save(self, path: str):
+        np.savez(
+            path,
+            coefficients=self.coefficients,
+            reference_temperature=self.reference_temperature,
+        )
+
+    @classmethod
+    def load(cls, path: str):
+        with np.load(path) as cached:
+            coefficients = cached["coefficients"]
+            calibration = cls(coefficients.shape[0], coefficients.shape[1] - 1)
+            calibration.coefficients = coefficients
+            calibration.reference_temperature = cached["reference_temperature"]
+        return calibration
+
+
+class TemperatureCompensator:
+    """
+    Removes temperature drift from raw samples using a fitted calibration.
+
+    Chip temperature changes far more slowly than the sample rate, so it is
+    read only every `decimation` frames and held in between; the drift
+    correction is recomputed only when the temperature is read, and every
+    other frame costs a single subtraction.
+
+    Attributes
+    ----------
+    calibration: TemperatureCalibration
+        Fitted drift model
+    temp_filtered: bool
+        Flag indicating if compensated samples should exclude the
+        temperature channels
+    decimation: int
+        Number of frames between temperature reads
+
+    Methods
+    -------
+    update(sample):
+        Compensate a single raw sample
+    apply(samples):
+        Compensate a batch of raw samples
+    """
+
+    def __init__(
+        self,
+        calibration: TemperatureCalibration,
+        temp_filtered: bool = True,
+        decimation: int = 100,
+    ):
+        """Initializes a TemperatureCompensator object."""
+        self.calibration = calibration
+        self.temp_filtered = temp_filtered
+        self.decimation = max(1, decimation)
+
+        num_mags = calibration.num_mags
+        self._field_mask = np.ones((4 * num_mags,), dtype=bool)
+        self._field_mask[::4] = False
+        self._out_mask = self._field_mask if temp_filtered else slice(None)
+        self.temperature = np.array(calibration.reference_temperature, dtype=float)
+        self._correction = np.zeros((4 * num_mags,))
+        self._frame_cnt = 0
+
+    def update(self, sample):
+        """
+        Compensate a single raw sample
+
+        Parameters
+        ----------
+        sample : np.ndarray
+            (4 * num_mags,) sample without timestamp, including temperature
+
+        Returns
+        -------
+        np.ndarray
+            Compensated sample, without temperature if temp_filtered
+        """
+        sample = np.asarray(sample, dtype=float)
+        if self._frame_cnt % self.decimation == 0:
+            self.temperature = sample[::4].copy()
+            self._correction[self._field_mask] = self.calibration.drift(
+                self.temperature
+            )
+        self._frame_cnt += 1
+        return (sample - self._correction)[self._out_mask]
+
+    def apply(self, samples):
+        """
+        Compensate a batch of raw samples
+
+        Parameters
+        ----------
+        samples : np.ndarray
+            (N, 4 * num_mags) samples without timestamps, including
+            temperature
+
+        Returns
+        -------
+        np.ndarray
+            Compensated samples, without temperature if temp_filtered
+        """
+        samples = np.atleast_2d(np.asarray(samples, dtype=float))
+        frames = self._frame_cnt + np.arange(len(samples))
+        # Index of the frame whose temperature is held for every frame
+        held = frames - frames % self.decimation - self._frame_cnt
+        reads = np.unique(held)
+        temperatures = np.empty((len(reads), self.calibration.num_mags))
+        if reads[0] < 0:
+            temperatures[0] = self.temperature
+        temperatures[reads >= 0] = samples[reads[reads >= 0], ::4]
+
+        corrections = np.zeros((len(reads), samples.shape[1]))
+        corrections[:, self._field_mask] = self.calibration.drift(temperatures)
+        compensated = samples - corrections[np.searchsorted(reads, held)]
+
+        self.temperature = temperatures[-1]
+        self._correction = corrections[-1]
+        self._frame_cnt += len(samples)
+        return compensated[:, self._out_mask]
+
+
+if __name__ == "__main__":
+    # fmt: off
+    parser = argparse.ArgumentParser(description="Fit temperature drift coefficients from long AnySkin recordings taken with temperature (temp_filtered=False)")
+    parser.add_argument("recordings", type=str, nargs="+", help=".npy or .txt recordings of [timestamp, T0, Bx0, By0, Bz0, ...] samples")
+    parser.add_argument("-n", "--num_mags", type=int, help="number of magnetometers on the sensor board", default=5)
+    parser.add_argument("-d", "--degree", type=int, help="degree of the drift polynomial", default=2)
+    parser.add_argument("-o", "--output", type=str, help="path to save the calibration to", default="temperature_calibration.npz")
+    args = parser.parse_args()
+    # fmt: on
+
+    calibration = TemperatureCalibration(args.num_mags, args.degree)
+    for path in args.recordings:
+        data = np.load(path, mmap_mode="r") if path.endswith(".npy") else np.loadtxt(path)
+        for start in range(0, len(data), 100000):
+            calibration.partial_fit(data[start : start + 100000, 1:])
+    calibration.fit()
+    calibration.save(args.output)
+    print(f"Fitted drift over {calibration._count} samples; saved to {args.output}")
@@ -9,10 +9,13 @@ import sys
 import pygame
 from datetime import datetime
 from anyskin import AnySkinProcess
+from anyskin.layout import get_layout
+from anyskin.recording import RECORDING_EXT, RecordingWriter
+from anyskin.replay import Replay
 import argparse
 
 
-def visualize(port, file=None, viz_mode="3axis", scaling=7.0, record=False):
+def visualize(port, file=None, viz_mode="3axis", scaling=7.0, record=False, speed=1.0):
     if file is None:
         sensor_stream = AnySkinProcess(
             num_mags=5,
@@ -22,8 +25,15 @@ def visualize(port, file=None, viz_mode="3axis", scaling=7.0, record=False):
         sensor_stream.start()
         time.sleep(1.0)
         filename = "data/data_" + datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        if record:
+            recorder = RecordingWriter(
+                filename + RECORDING_EXT,
+                num_mags=5,
+                layout="anyskin",
+                metadata={"baseline_subtracted": True},
+            )
     else:
-        load_data = np.loadtxt(file)
+        replay = Replay(file, speed=speed)
 
     pygame.init()
     dir_path = os.path.dirname(os.path.realpath(__file__))
@@ -35,16 +45,8 @@ def visualize(port, file=None, viz_mode="3axis", scaling=7.0, record=False):
     desired_width = 400
     desired_height = int(desired_width * aspect_ratio)
 
-    chip_locations = np.array(
-        [
-            [204, 222],  # center
-            [130, 222],  # left
-            [279, 222],  # right
-            [204, 157],  # up
-            [204, 290],  # down
-        ]
-    )
-    chip_xy_rotations = np.array([-np.pi / 2, -np.pi / 2, np.pi, np.pi / 2, 0.0])
+    layout = get_layout("anyskin")
+    chip_locations = layout.pixel_positions(desired_width)
 
     # Resize the background image to the new dimensions
     bg_image = pygame.transform.scale(bg_image, (desired_width, desired_height))
@@ -57,7 +59,7 @@ def visualize(port, file=None, viz_mode="3axis", scaling=7.0, record=False):
     pygame.display.set_caption("Sensor Data Visualization")
 
     def visualize_data(data):
-        data = data.reshape(-1, 3)
+        data = layout.transform(data)[0]
         # data = data - data[0:1]
         data_mag = np.linalg.norm(data, axis=1)
         # print(angles)
@@ -80,38 +82,14 @@ def visualize(port, file=None, viz_mode="3axis", scaling=7.0, record=False):
                     width,
                 )
                 arrow_start = chip_location
-                rotation_mat = np.array(
-                    [
-                        [
-                            np.cos(chip_xy_rotations[magid]),
-                            -np.sin(chip_xy_rotations[magid]),
-                        ],
-                        [
-                            np.sin(chip_xy_rotations[magid]),
-                            np.cos(chip_xy_rotations[magid]),
-                        ],
-                    ]
-                )
-                data_xy = np.dot(rotation_mat, data[magid, :2])
                 arrow_end = (
-                    chip_location[0] + data_xy[0] / scaling,
-                    chip_location[1] + data_xy[1] / scaling,
+                    chip_location[0] + data[magid, 0] / scaling,
+                    chip_location[1] + data[magid, 1] / scaling,
                 )
                 pygame.draw.line(window, (0, 255, 0), arrow_start, arrow_end, 2)
 
-    def get_baseline():
-        baseline_data = sensor_stream.get_data(num_samples=5)
-        baseline_data = np.array(baseline_data)[:, 1:]
-        baseline = np.mean(baseline_data, axis=0)
-        return baseline
-
-    time.sleep(0.1)
-    if file is None:
-        baseline = get_baseline()
     frame_num = 0
     running = True
-    data = []
-    data_len = 30000
     clock = pygame.time.Clock()
     FPS = 60
     while running:
@@ -125,19 +103,21 @@ def visualize(port, file=None, viz_mode="3axis", scaling=7.0, record=False):
                 print(f"Mouse clicked at ({x}, {y})")
             # Check if user pressed b
             if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_b:
-                    baseline_data = sensor_stream.get_data(num_samples=5)
-                    baseline_data = np.array(baseline_data)[:, 1:]
-                    baseline = np.mean(baseline_data, axis=0)
+                if event.key == pygame.K_b and file is None:
+                    sensor_stream.rebaseline()
+                if event.key == pygame.K_SPACE and file is not None:
+                    replay.toggle_pause()
+                if event.key in (pygame.K_LEFT, pygame.K_RIGHT) and file is not None:
+                    replay.skip(1 if event.key == pygame.K_RIGHT else -1)
         if file is not None:
-            sensor_data = load_data[data_len]
-            data_len += 24
-            baseline = np.zeros_like(sensor_data)
+            sensor_data = replay.get_frame()
             # print(f"curr_time: {time.time() - start_time}")
         else:
-            sensor_data = sensor_stream.get_data(num_samples=1)[0][1:]
-            data.append(sensor_data - baseline)
-        visualize_data(sensor_data - baseline)
+            sample = sensor_stream.get_data(num_samples=1, subtract_baseline=True)[0]
+            sensor_data = sample[1:]
+            if record:
+                recorder.write(sample)
+        visualize_data(sensor_data)
         frame_num += 1
         # print(sensor_data - baseline)
         pygame.display.update()
@@ -146,9 +126,8 @@ def visualize(port, file=None, viz_mode="3axis", scaling=7.0, record=False):
     if file is None:
         sensor_stream.pause_streaming()
         sensor_stream.join()
-        data = np.array(data)
         if record:
-            np.savetxt(f"{filename}.txt", data)
+            recorder.close()
 
 
 def default_viz(argv=sys.argv):
@@ -163,6 +142,7 @@ if __name__ == "__main__":
     parser.add_argument("-v", "--viz_mode", type=str, help="visualization mode", default="3axis", choices=["magnitude", "3axis"])
     parser.add_argument("-s", "--scaling", type=float, help="scaling factor for visualization", default=7.0)
     parser.add_argument('-r', '--record', action='store_true', help='record data')
+    parser.add_argument("--speed", type=float, help="playback speed when replaying a file", default=1.0)
     args = parser.parse_args()
     # fmt: on
-    visualize(args.port, args.file, args.viz_mode, args.scaling, args.record)
+    visualize(args.port, args.file, args.viz_mode, args.scaling, args.record, args.speed)
@@ -9,10 +9,13 @@ import sys
 import pygame
 from datetime import datetime
 from anyskin import AnySkinProcess
+from anyskin.layout import get_layout
+from anyskin.recording import RECORDING_EXT, RecordingWriter
+from anyskin.replay import Replay
 import argparse
 
 
-def visualize(port, file=None, viz_mode="3axis", scaling=7.0, record=False):
+def visualize(port, file=None, viz_mode="3axis", scaling=7.0, record=False, speed=1.0):
     if file is None:
         sensor_stream = AnySkinProcess(
             num_mags=10, 
@@ -21,8 +24,15 @@ def visualize(port, file=None, viz_mode="3axis", scaling=7.0, record=False):
         sensor_stream.start()
         time.sleep(1.0)
         filename = "data/data_" + datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        if record:
+            recorder = RecordingWriter(
+                filename + RECORDING_EXT,
+                num_mags=10,
+                layout="anyskin_bislot",
+                metadata={"baseline_subtracted": True},
+            )
     else:
-        load_data = np.loadtxt(file)
+        replay = Replay(file, speed=speed)
 
     pygame.init()
     dir_path = os.path.dirname(os.path.realpath(__file__))
@@ -44,47 +54,17 @@ def visualize(port, file=None, viz_mode="3axis", scaling=7.0, record=False):
     total_width = desired_width * 2
     window = pygame.display.set_mode((total_width, desired_height), pygame.SRCALPHA)
 
-    chip_locations_board1 = np.array(
-        [
-            [305, 333],  # center
-            [195, 333],  # left
-            [415, 333],  # right
-            [305, 233],  # up
-            [305, 433],  # down
-        ]
-    )
-    chip_locations_board2 = chip_locations_board1 + np.array([desired_width, 0])
-
-    chip_locations = np.vstack((chip_locations_board1, chip_locations_board2))
-    chip_xy_rotations = np.tile(
-        np.array([-np.pi / 2, -np.pi / 2, np.pi, np.pi / 2, 0.0]), 2
-    )
-    chip_xy_rotations_board2 = chip_xy_rotations + np.pi
-    chip_xy_rotations = np.hstack((chip_xy_rotations, chip_xy_rotations_board2))
-
-    def transform_board2_data(data_board2, f=1.0):
-        data_board2 = data_board2.reshape(-1, 3)
-
-        data_board2[:, 0] = -data_board2[:, 0]
-        data_board2 = data_board2 * f
-
-        return data_board2
-
+    # Both boards are drawn on the first board's image
+    layout = get_layout("anyskin_bislot")
+    chip_locations = layout.pixel_positions(desired_width)[:5]
 
     def visualize_data(data):
-        data = data.reshape(-1, 3)
+        data = layout.transform(data)[0]
 
-        # Split data for the two boards
-        data_board1 = data[:5]
-        # data_board1 = data_board1 - data_board1[0:1]
-        data_board2 = data[5:]
-        # data_board2 = data_board2 - data_board2[0:1]
+        # Board 2 faces board 1, so its x axis is mirrored by the layout
+        subtracted_data = data[:5] + data[5:]
 
-        transformed_board2 = transform_board2_data(data_board2, f=1.0)
-
-        subtracted_data = data_board1 + transformed_board2
-
-        for magid, chip_location in enumerate(chip_locations_board1):
+        for magid, chip_location in enumerate(chip_locations):
             if viz_mode == "magnitude":
                 pygame.draw.circle(
                     window, (255, 83, 72), chip_location, np.linalg.norm(subtracted_data[magid]) / scaling
@@ -102,38 +82,14 @@ def visualize(port, file=None, viz_mode="3axis", scaling=7.0, record=False):
                     width,
                 )
                 arrow_start = chip_location
-                rotation_mat = np.array(
-                    [
-                        [
-                            np.cos(chip_xy_rotations[magid]),
-                            -np.sin(chip_xy_rotations[magid]),
-                        ],
-                        [
-                            np.sin(chip_xy_rotations[magid]),
-                            np.cos(chip_xy_rotations[magid]),
-                        ],
-                    ]
-                )
-                data_xy = np.dot(rotation_mat, subtracted_data[magid, :2])
                 arrow_end = (
-                    chip_location[0] + data_xy[0] / scaling,
-                    chip_location[1] + data_xy[1] / scaling,
+                    chip_location[0] + subtracted_data[magid, 0] / scaling,
+                    chip_location[1] + subtracted_data[magid, 1] / scaling,
                 )
                 pygame.draw.line(window, (0, 255, 0), arrow_start, arrow_end, 2)
 
-    def get_baseline():
-        baseline_data = sensor_stream.get_data(num_samples=5)
-        baseline_data = np.array(baseline_data)[:, 1:]
-        baseline = np.mean(baseline_data, axis=0)
-        return baseline
-
-    time.sleep(0.1)
-    if file is None:
-        baseline = get_baseline()
     frame_num = 0
     running = True
-    data = []
-    data_len = 30000
     clock = pygame.time.Clock()
     FPS = 60
     while running:
@@ -150,31 +106,31 @@ def visualize(port, file=None, viz_mode="3axis", scaling=7.0, record=False):
                 x, y = pygame.mouse.get_pos()
                 print(f"Mouse clicked at ({x}, {y})")
             if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_b:
-                    # Recalculate baseline
-                    baseline_data = sensor_stream.get_data(num_samples=5)
-                    baseline_data = np.array(baseline_data)[:, 1:]
-                    baseline = np.mean(baseline_data, axis=0)
+                if event.key == pygame.K_b and file is None:
+                    sensor_stream.rebaseline()
+                if event.key == pygame.K_SPACE and file is not None:
+                    replay.toggle_pause()
+                if event.key in (pygame.K_LEFT, pygame.K_RIGHT) and file is not None:
+                    replay.skip(1 if event.key == pygame.K_RIGHT else -1)
 
         if file is not None:
-            sensor_data = load_data[data_len]
-            data_len += 24
-            baseline = np.zeros_like(sensor_data)
+            sensor_data = replay.get_frame()
         else:
-            sensor_data = sensor_stream.get_data(num_samples=1)[0][1:]
-            data.append(sensor_data - baseline)
+            sample = sensor_stream.get_data(num_samples=1, subtract_baseline=True)[0]
+            sensor_data = sample[1:]
+            if record:
+                recorder.write(sample)
         
         # Visualize data on top of the cleared layer and backgrounds
-        visualize_data(sensor_data - baseline)
+        visualize_data(sensor_data)
         pygame.display.update()
         clock.tick(FPS)
     pygame.quit()
     if file is None:
         sensor_stream.pause_streaming()
         sensor_stream.join()
-        data = np.array(data)
         if record:
-            np.savetxt(f"{filename}.txt", data)
+            recorder.close()
 
 
 def default_viz(argv=sys.argv):
@@ -189,6 +145,7 @@ if __name__ == "__main__":
     parser.add_argument("-v", "--viz_mode", type=str, help="visualization mode", default="3axis", choices=["magnitude", "3axis"])
     parser.add_argument("-s", "--scaling", type=float, help="scaling factor for visualization", default=7.0)
     parser.add_argument('-r', '--record', action='store_true', help='record data')
+    parser.add_argument("--speed", type=float, help="playback speed when replaying a file", default=1.0)
     args = parser.parse_args()
     # fmt: on
-    visualize(args.port, args.file, args.viz_mode, args.scaling, args.record)
+    visualize(args.port, args.file, args.viz_mode, args.scaling, args.record, args.speed)
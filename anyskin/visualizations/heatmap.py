@@ -32,12 +32,13 @@ def plot_heatmap(data, num_mags):
     plt.show()
 
 
-def update_data(ax, sensor, init_time, baseline, ln, xdata, ydata, i):
+def update_data(ax, sensor, init_time, ln, xdata, ydata, i):
     sensor.pause_buffering()
     buf = np.array(sensor.get_buffer())
     sensor.start_buffering()
     times = buf[:, 0] - init_time
-    data = buf[:, 1:] - baseline
+    # Buffered samples are raw; subtract the current drift-tracked baseline
+    data = buf[:, 1:] - sensor.baseline
 
     xdata.extend(list(times))
     ydata.extend(list(data))
@@ -75,8 +76,7 @@ if __name__ == "__main__":
         )
         anyskin.start()
         time.sleep(1.0)
-        init_data = np.array(anyskin.get_data(num_samples))
-        baseline = np.mean(init_data[..., 1:], axis=0, keepdims=True)
+        init_data = np.array(anyskin.get_data(num_samples, subtract_baseline=True))
         init_time = init_data[0, 0]
 
         anyskin.start_buffering()
@@ -85,7 +85,7 @@ if __name__ == "__main__":
         xdata, ydata = deque(maxlen=num_samples), deque(maxlen=num_samples)
 
         xdata.extend(list(init_data[..., 0]) - init_time)
-        ydata.extend(list(init_data[..., 1:] - baseline))
+        ydata.extend(list(init_data[..., 1:]))
 
         ln = ax.pcolormesh(np.array(ydata).T, vmin=args.lims[0], vmax=args.lims[1])
         ax.set_xticks(np.arange(0, num_samples, max(1, num_samples // 10)))
@@ -100,7 +100,7 @@ if __name__ == "__main__":
         ani = FuncAnimation(
             fig,
             lambda i: update_data(
-                ax, anyskin, init_time, baseline, ln, xdata, ydata, i
+                ax, anyskin, init_time, ln, xdata, ydata, i
             ),
             blit=False,
         )
@@ -8,11 +8,14 @@ os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
 import sys
 import pygame
 from datetime import datetime
-from anyskin import AnySkinProcess
+from anyskin import AnySkinProcess, CrosstalkCalibration, InterferenceMonitor
+from anyskin.layout import get_layout
+from anyskin.recording import RECORDING_EXT, RecordingWriter
+from anyskin.replay import Replay
 import argparse
 
 
-def visualize(port, file=None, viz_mode="3axis", scaling=7.0, record=False):
+def visualize(port, file=None, viz_mode="3axis", scaling=7.0, record=False, board_ids=None, speed=1.0):
     if file is None:
         sensor_stream = AnySkinProcess(
             num_mags=10,  # Handle 10 sensors for both boards
@@ -23,7 +26,7 @@ def visualize(port, file=None, viz_mode="3axis", scaling=7.0, record=False):
         time.sleep(1.0)
         filename = "data/data_" + datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
     else:
-        load_data = np.loadtxt(file)
+        replay = Replay(file, speed=speed)
 
     pygame.init()
     dir_path = os.path.dirname(os.path.realpath(__file__))
@@ -47,24 +50,11 @@ def visualize(port, file=None, viz_mode="3axis", scaling=7.0, record=False):
     total_width = desired_width * 2
     window = pygame.display.set_mode((total_width, desired_height), pygame.SRCALPHA)
 
-    chip_locations_board1 = np.array(
-        [
-            [305, 333],  # center
-            [195, 333],  # left
-            [415, 333],  # right
-            [305, 233],  # up
-            [305, 433],  # down
-        ]
-    )
-    chip_locations_board2 = chip_locations_board1 + np.array([desired_width, 0])
-
-    chip_locations = np.vstack((chip_locations_board1, chip_locations_board2))
-    chip_xy_rotations = np.tile(
-        np.array([-np.pi / 2, -np.pi / 2, np.pi, np.pi / 2, 0.0]), 2
-    )
+    layout = get_layout("anyskin_pair")
+    chip_locations = layout.pixel_positions(desired_width)
 
     def visualize_data(data):
-        data = data.reshape(-1, 3)
+        data = layout.transform(data)[0]
         data_mag = np.linalg.norm(data, axis=1)
         # Draw the chip locations
         for magid, chip_location in enumerate(chip_locations):
@@ -85,38 +75,32 @@ def visualize(port, file=None, viz_mode="3axis", scaling=7.0, record=False):
                     width,
                 )
                 arrow_start = chip_location
-                rotation_mat = np.array(
-                    [
-                        [
-                            np.cos(chip_xy_rotations[magid]),
-                            -np.sin(chip_xy_rotations[magid]),
-                        ],
-                        [
-                            np.sin(chip_xy_rotations[magid]),
-                            np.cos(chip_xy_rotations[magid]),
-                        ],
-                    ]
-                )
-                data_xy = np.dot(rotation_mat, data[magid, :2])
                 arrow_end = (
-                    chip_location[0] + data_xy[0] / scaling,
-                    chip_location[1] + data_xy[1] / scaling,
+                    chip_location[0] + data[magid, 0] / scaling,
+                    chip_location[1] + data[magid, 1] / scaling,
                 )
                 pygame.draw.line(window, (0, 255, 0), arrow_start, arrow_end, 2)
 
-    def get_baseline():
-        baseline_data = sensor_stream.get_data(num_samples=5)
-        baseline_data = np.array(baseline_data)[:, 1:]
-        baseline = np.mean(baseline_data, axis=0)
-        return baseline
+    crosstalk = None
+    if board_ids is not None:
+        crosstalk = CrosstalkCalibration.load(board_ids, num_mags_a=5, num_mags_b=5)
+        if crosstalk is None:
+            print(f"No crosstalk calibration cached for boards {board_ids}; "
+                  "run python -m anyskin.crosstalk to create one")
+
+    if record and file is None:
+        recorder = RecordingWriter(
+            filename + RECORDING_EXT,
+            num_mags=10,
+            layout="anyskin_pair",
+            device_ids=board_ids,
+            metadata={"baseline_subtracted": True, "crosstalk_compensated": crosstalk is not None},
+        )
 
-    time.sleep(0.1)
-    if file is None:
-        baseline = get_baseline()
+    # Running correlation between the two boards' chips
+    interference_monitor = InterferenceMonitor(num_mags_a=5, num_mags_b=5)
     frame_num = 0
     running = True
-    data = []
-    data_len = 30000
     clock = pygame.time.Clock()
     FPS = 60
     while running:
@@ -134,31 +118,42 @@ def visualize(port, file=None, viz_mode="3axis", scaling=7.0, record=False):
                 x, y = pygame.mouse.get_pos()
                 print(f"Mouse clicked at ({x}, {y})")
             if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_b:
-                    # Recalculate baseline
-                    baseline_data = sensor_stream.get_data(num_samples=5)
-                    baseline_data = np.array(baseline_data)[:, 1:]
-                    baseline = np.mean(baseline_data, axis=0)
+                if event.key == pygame.K_b and file is None:
+                    sensor_stream.rebaseline()
+                if event.key == pygame.K_SPACE and file is not None:
+                    replay.toggle_pause()
+                if event.key in (pygame.K_LEFT, pygame.K_RIGHT) and file is not None:
+                    replay.skip(1 if event.key == pygame.K_RIGHT else -1)
 
         if file is not None:
-            sensor_data = load_data[data_len]
-            data_len += 24
-            baseline = np.zeros_like(sensor_data)
+            sensor_data = replay.get_frame()
         else:
-            sensor_data = sensor_stream.get_data(num_samples=1)[0][1:]
-            data.append(sensor_data - baseline)
+            sample = sensor_stream.get_data(num_samples=1, subtract_baseline=True)[0]
+            if crosstalk is not None:
+                sample[1:] = crosstalk.apply(sample[1:])
+            sensor_data = sample[1:]
+            if record:
+                recorder.write(sample)
         
         # Visualize data on top of the cleared layer and backgrounds
-        visualize_data(sensor_data - baseline)
+        visualize_data(sensor_data)
+        interference_monitor.update(sensor_data)
+        if frame_num % FPS == 0:
+            scores = interference_monitor.scores
+            chip_a, chip_b = np.unravel_index(np.argmax(scores), scores.shape)
+            pygame.display.set_caption(
+                f"Max interference: {scores[chip_a, chip_b]:.2f} "
+                f"(board 1 chip {chip_a}, board 2 chip {chip_b})"
+            )
+        frame_num += 1
         pygame.display.update()
         clock.tick(FPS)
     pygame.quit()
     if file is None:
         sensor_stream.pause_streaming()
         sensor_stream.join()
-        data = np.array(data)
         if record:
-            np.savetxt(f"{filename}.txt", data)
+            recorder.close()
 
 
 def default_viz(argv=sys.argv):
@@ -173,6 +168,8 @@ if __name__ == "__main__":
     parser.add_argument("-v", "--viz_mode", type=str, help="visualization mode", default="3axis", choices=["magnitude", "3axis"])
     parser.add_argument("-s", "--scaling", type=float, help="scaling factor for visualization", default=7.0)
     parser.add_argument('-r', '--record', action='store_true', help='record data')
+    parser.add_argument("--speed", type=float, help="playback speed when replaying a file", default=1.0)
+    parser.add_argument("-id", "--board-ids", type=str, nargs=2, help="board identifiers; removes crosstalk using their cached calibration", default=None)
     args = parser.parse_args()
     # fmt: on
-    visualize(args.port, args.file, args.viz_mode, args.scaling, args.record)
+    visualize(args.port, args.file, args.viz_mode, args.scaling, args.record, args.board_ids, args.speed)
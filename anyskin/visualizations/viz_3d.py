@@ -9,12 +9,15 @@ import sys
 import pygame
 from datetime import datetime
 from anyskin import AnySkinProcess
+from anyskin.layout import get_layout
+from anyskin.recording import RECORDING_EXT, RecordingWriter
+from anyskin.replay import Replay
 import argparse
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
 
 
-def visualize(port, file=None, viz_mode="3axis", scaling=7.0, record=False):
+def visualize(port, file=None, viz_mode="3axis", scaling=7.0, record=False, speed=1.0):
     if file is None:
         sensor_stream = AnySkinProcess(
             num_mags=5,
@@ -23,20 +26,19 @@ def visualize(port, file=None, viz_mode="3axis", scaling=7.0, record=False):
         sensor_stream.start()
         time.sleep(1.0)
         filename = "data/data_" + datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        if record:
+            recorder = RecordingWriter(
+                filename + RECORDING_EXT,
+                num_mags=5,
+                layout="anyskin",
+                metadata={"baseline_subtracted": True},
+            )
     else:
-        load_data = np.loadtxt(file)
-        data_len = 0
+        replay = Replay(file, speed=speed)
 
     # Sensor chip locations for 2D and 3D
-    chip_locations = np.array(
-        [
-            [204, 222],  # center
-            [130, 222],  # left
-            [279, 222],  # right
-            [204, 157],  # up
-            [204, 290],  # down
-        ]
-    )
+    layout = get_layout("anyskin")
+    chip_locations = layout.pixel_positions(400)
     chip_3d_locations = np.array(
         [
             [0, 0, 0],     # center
@@ -46,7 +48,6 @@ def visualize(port, file=None, viz_mode="3axis", scaling=7.0, record=False):
             [0, -10, 0],   # down
         ]
     )
-    chip_xy_rotations = np.array([-np.pi / 2, -np.pi / 2, np.pi, np.pi / 2, 0.0])
 
     # Initialize Pygame for 2D visualization
     pygame.init()
@@ -62,21 +63,13 @@ def visualize(port, file=None, viz_mode="3axis", scaling=7.0, record=False):
     ax = fig.add_subplot(111, projection="3d")
     plt.ion()  # Enable interactive mode for live plotting
 
-    def get_baseline():
-        """Calculate baseline values."""
-        baseline_data = sensor_stream.get_data(num_samples=5)
-        baseline_data = np.array(baseline_data)[:, 1:]
-        return np.mean(baseline_data, axis=0)
-
-    baseline = get_baseline() if file is None else np.zeros(15)
     running = True
     in_3d_mode = False
-    data = []
 
     def draw_2d(data):
         """Draw the 2D visualization."""
         window.blit(bg_image, (0, 0))
-        data = data.reshape(-1, 3)
+        data = layout.transform(data)[0]
         data_mag = np.linalg.norm(data, axis=1)
         for magid, chip_location in enumerate(chip_locations):
             # Draw circles for magnitude
@@ -84,16 +77,9 @@ def visualize(port, file=None, viz_mode="3axis", scaling=7.0, record=False):
                 window, (255, 83, 72), chip_location, data_mag[magid] / scaling
             )
             # Draw arrows for direction
-            rotation_mat = np.array(
-                [
-                    [np.cos(chip_xy_rotations[magid]), -np.sin(chip_xy_rotations[magid])],
-                    [np.sin(chip_xy_rotations[magid]), np.cos(chip_xy_rotations[magid])],
-                ]
-            )
-            data_xy = np.dot(rotation_mat, data[magid, :2])
             arrow_end = (
-                chip_location[0] + data_xy[0] / scaling,
-                chip_location[1] + data_xy[1] / scaling,
+                chip_location[0] + data[magid, 0] / scaling,
+                chip_location[1] + data[magid, 1] / scaling,
             )
             pygame.draw.line(window, (0, 255, 0), chip_location, arrow_end, 2)
         pygame.display.update()
@@ -120,9 +106,12 @@ def visualize(port, file=None, viz_mode="3axis", scaling=7.0, record=False):
         if in_3d_mode:
             # 3D visualization loop
             if file is None:
-                sensor_data = sensor_stream.get_data(num_samples=1)[0][1:]
-                sensor_data -= baseline
-                data.append(sensor_data)
+                sample = sensor_stream.get_data(num_samples=1, subtract_baseline=True)[0]
+                sensor_data = sample[1:]
+                if record:
+                    recorder.write(sample)
+            else:
+                sensor_data = replay.get_frame()
             draw_3d(sensor_data)
         else:
             # 2D visualization loop
@@ -133,13 +122,20 @@ def visualize(port, file=None, viz_mode="3axis", scaling=7.0, record=False):
                     if event.key == pygame.K_3:
                         in_3d_mode = True
                         plt.show()  # Switch to 3D mode
-                    elif event.key == pygame.K_b:
-                        baseline = get_baseline() if file is None else np.zeros(15)
+                    elif event.key == pygame.K_b and file is None:
+                        sensor_stream.rebaseline()
+                    elif event.key == pygame.K_SPACE and file is not None:
+                        replay.toggle_pause()
+                    elif event.key in (pygame.K_LEFT, pygame.K_RIGHT) and file is not None:
+                        replay.skip(1 if event.key == pygame.K_RIGHT else -1)
 
             if file is None:
-                sensor_data = sensor_stream.get_data(num_samples=1)[0][1:]
-                sensor_data -= baseline
-                data.append(sensor_data)
+                sample = sensor_stream.get_data(num_samples=1, subtract_baseline=True)[0]
+                sensor_data = sample[1:]
+                if record:
+                    recorder.write(sample)
+            else:
+                sensor_data = replay.get_frame()
             draw_2d(sensor_data)
 
     # Cleanup
@@ -149,7 +145,7 @@ def visualize(port, file=None, viz_mode="3axis", scaling=7.0, record=False):
     pygame.quit()
     plt.close(fig)
     if record and file is None:
-        np.savetxt(f"{filename}.txt", np.array(data))
+        recorder.close()
 
 
 if __name__ == "__main__":
@@ -159,5 +155,6 @@ if __name__ == "__main__":
     parser.add_argument("-v", "--viz_mode", type=str, help="visualization mode", default="3axis", choices=["magnitude", "3axis"])
     parser.add_argument("-s", "--scaling", type=float, help="scaling factor for visualization", default=7.0)
     parser.add_argument("-r", "--record", action="store_true", help="record data")
+    parser.add_argument("--speed", type=float, help="playback speed when replaying a file", default=1.0)
     args = parser.parse_args()
-    visualize(args.port, args.file, args.viz_mode, args.scaling, args.record)
+    visualize(args.port, args.file, args.viz_mode, args.scaling, args.record, args.speed)
@@ -0,0 +1,56 @@
+import numpy as np
+
+from anyskin import BaselineTracker
+
+
+def test_seeds_from_initial_samples():
+    tracker = BaselineTracker(num_mags=2, init_samples=5)
+    samples = np.random.default_rng(0).normal(100.0, 1.0, size=(5, 6))
+    for sample in samples:
+        tracker.update(sample)
+    assert tracker.is_seeded
+    np.testing.assert_allclose(tracker.baseline, samples.mean(axis=0))
+
+
+def test_tracks_drift_and_freezes_on_contact():
+    tracker = BaselineTracker(
+        num_mags=1, alpha=0.1, contact_threshold=10.0, holdoff=3, init_samples=1
+    )
+    tracker.update(np.zeros(3))
+    for _ in range(100):
+        tracker.update(np.full(3, 2.0))
+    np.testing.assert_allclose(tracker.baseline, 2.0, atol=1e-3)
+
+    delta = tracker.update(np.array([2.0, 2.0, 50.0]))
+    assert tracker.in_contact
+    np.testing.assert_allclose(delta, [0.0, 0.0, 48.0], atol=1e-3)
+    for _ in range(10):
+        tracker.update(np.array([2.0, 2.0, 50.0]))
+    np.testing.assert_allclose(tracker.baseline, 2.0, atol=1e-3)
+
+    # Baseline stays frozen through the hold-off after release
+    for _ in range(3):
+        tracker.update(np.full(3, 3.0))
+    np.testing.assert_allclose(tracker.baseline, 2.0, atol=1e-3)
+    tracker.update(np.full(3, 3.0))
+    assert tracker.baseline[0] > 2.0
+
+
+def test_temperature_channels_do_not_gate_contact():
+    tracker = BaselineTracker(
+        num_mags=1, temp_filtered=False, contact_threshold=10.0, init_samples=1
+    )
+    tracker.update(np.zeros(4))
+    tracker.update(np.array([100.0, 0.0, 0.0, 0.0]))
+    assert not tracker.in_contact
+
+
+def test_rebaseline_reseeds():
+    tracker = BaselineTracker(num_mags=1, init_samples=2)
+    tracker.update(np.zeros(3))
+    tracker.update(np.zeros(3))
+    tracker.rebaseline()
+    assert not tracker.is_seeded
+    tracker.update(np.full(3, 5.0))
+    tracker.update(np.full(3, 7.0))
+    np.testing.assert_allclose(tracker.baseline, 6.0)
@@ -0,0 +1,74 @@
+import os
+
+import numpy as np
+
+from anyskin import RecordingWriter, RunCatalog
+from anyskin.legacy import find_recordings, infer_columns
+
+
+def _datacollect_run(root, day, run, data):
+    run_dir = os.path.join(root, day, run)
+    os.makedirs(run_dir)
+    np.savetxt(os.path.join(run_dir, "buffered_data.csv"), data, delimiter=",")
+    return run_dir
+
+
+def test_indexes_and_queries(tmp_path):
+    root = str(tmp_path)
+    rng = np.random.default_rng(0)
+    a = rng.normal(size=(250, 15))
+    b = rng.normal(size=(40, 15))
+    _datacollect_run(root, "2024_12_09", "test_run_10_00_00", a)
+    _datacollect_run(root, "2024_12_09", "test_run_11_00_00", b)
+    _datacollect_run(root, "2024_12_10", "test_run_09_00_00", b)
+    times = 1700000000.0 + np.arange(100) / 100.0
+    path = os.path.join(root, "data", "data_2024-12-11_08-00-00.anyskin")
+    with RecordingWriter(path, 5) as writer:
+        writer.write(np.hstack((times[:, None], a[:100])))
+
+    with RunCatalog(root) as catalog:
+        assert catalog.update() == (4, 0, 0)
+        assert catalog.update() == (0, 0, 0)
+
+        runs, last = catalog.last_readings(date="2024-12-09")
+        assert [run["name"] for run in runs] == [
+            os.path.join("2024_12_09", "test_run_10_00_00"),
+            os.path.join("2024_12_09", "test_run_11_00_00"),
+        ]
+        np.testing.assert_allclose(last, [a[-1], b[-1]])
+        assert runs[0]["num_frames"] == 250 and runs[0]["num_mags"] == 5
+
+        runs, std = catalog.statistic("std", since="2024-12-10")
+        assert [run["format"] for run in runs] == ["csv", "anyskin"]
+        np.testing.assert_allclose(std, [b.std(axis=0), a[:100].std(axis=0)], rtol=1e-5)
+        assert abs(runs[1]["duration"] - 0.99) < 1e-6
+
+        stats = catalog.channel_stats([runs[0]["id"]])
+        assert [s["name"] for s in stats[:4]] == ["Bx0", "By0", "Bz0", "Bx1"]
+        np.testing.assert_allclose([s["mean"] for s in stats], b.mean(axis=0))
+
+    # Changed and deleted runs are picked up incrementally
+    changed = os.path.join(root, "2024_12_10", "test_run_09_00_00", "buffered_data.csv")
+    np.savetxt(changed, a, delimiter=",")
+    os.remove(os.path.join(root, "2024_12_09", "test_run_11_00_00", "buffered_data.csv"))
+    with RunCatalog(root) as catalog:
+        assert catalog.update() == (0, 1, 1)
+        runs, last = catalog.last_readings(date="2024-12-10")
+        np.testing.assert_allclose(last, [a[-1]])
+        assert len(catalog.runs()) == 3
+
+
+def test_infer_columns():
+    assert infer_columns(np.zeros((5, 15))) == (False, 5, True)
+    assert infer_columns(np.zeros((5, 20)) + 1) == (False, 5, False)
+    stamped = np.hstack((1700000000.0 + np.arange(5)[:, None], np.zeros((5, 30))))
+    assert infer_columns(stamped) == (True, 10, True)
+
+
+def test_find_recordings_prefers_one_format(tmp_path):
+    run_dir = tmp_path / "run"
+    run_dir.mkdir()
+    for name in ("buffered_data.h5", "buffered_data.json", "buffered_data.csv"):
+        (run_dir / name).write_text("")
+    (run_dir / "notes.txt").write_text("")
+    assert find_recordings(str(tmp_path)) == [str(run_dir / "buffered_data.csv")]
@@ -0,0 +1,55 @@
+import numpy as np
+
+from anyskin import ContactDetector
+
+
+def _press(num_frames, chip_norms):
+    """Frames for a single-axis press with the given per-chip z field."""
+    deltas = np.zeros((num_frames, 3 * len(chip_norms)))
+    deltas[:, 2::3] = chip_norms
+    return deltas
+
+
+def test_onset_and_offset_with_debounce():
+    detector = ContactDetector(
+        num_mags=2, on_threshold=10.0, off_threshold=5.0, debounce=3
+    )
+    z = np.array([0, 20, 20, 20, 20, 7, 7, 2, 2, 2, 2], dtype=float)
+    deltas = np.zeros((len(z), 6))
+    deltas[:, 5] = z
+    times = np.arange(len(z)) * 0.01
+
+    events = detector.update(times, deltas)
+    assert [(e.chip, e.kind) for e in events] == [(1, "onset"), (1, "offset")]
+    np.testing.assert_allclose([e.time for e in events], [0.03, 0.09])
+    assert not detector.in_contact.any()
+
+
+def test_short_spikes_are_ignored():
+    detector = ContactDetector(num_mags=1, on_threshold=10.0, debounce=2)
+    deltas = _press(5, [0.0])
+    deltas[1::2, 2] = 50.0
+    assert detector.update(np.arange(5), deltas) == []
+
+
+def test_batches_match_single_frames():
+    rng = np.random.default_rng(1)
+    deltas = np.repeat(rng.uniform(0, 30, size=(40, 9)), 3, axis=0)
+    times = np.arange(len(deltas), dtype=float)
+
+    batched = ContactDetector(num_mags=3, on_threshold=20.0, off_threshold=10.0)
+    framewise = ContactDetector(num_mags=3, on_threshold=20.0, off_threshold=10.0)
+    expected = batched.update(times, deltas)
+    actual = []
+    for t, d in zip(times, deltas):
+        actual.extend(framewise.update(t, d))
+    assert expected == actual
+    assert len(expected) > 0
+
+
+def test_per_chip_thresholds():
+    detector = ContactDetector(
+        num_mags=2, on_threshold=[10.0, 100.0], off_threshold=5.0, debounce=1
+    )
+    events = detector.update([0.0], _press(1, [50.0, 50.0]))
+    assert [e.chip for e in events] == [0]
@@ -0,0 +1,46 @@
+import os
+
+import numpy as np
+
+from anyskin import RecordingReader
+from anyskin.convert import convert_tree
+
+
+def test_converts_tree_and_resumes(tmp_path):
+    root = str(tmp_path)
+    rng = np.random.default_rng(0)
+    run_dir = os.path.join(root, "2024_12_09", "test_run_10_11_12")
+    os.makedirs(run_dir)
+    untimed = rng.normal(size=(2345, 15))
+    np.savetxt(os.path.join(run_dir, "buffered_data.csv"), untimed, delimiter=",")
+
+    os.makedirs(os.path.join(root, "data"))
+    timed = np.hstack(
+        (1700000000.0 + np.arange(500)[:, None] / 200.0, rng.normal(size=(500, 20)))
+    )
+    np.savetxt(os.path.join(root, "data", "data_2024-12-10_08-00-00.txt"), timed)
+    with open(os.path.join(root, "data", "data_broken.txt"), "w") as f:
+        f.write("1 2 3 4 5\n")
+
+    converted, skipped, failed = convert_tree(root, jobs=2, block_rows=1000)
+    assert sorted(n for _, n in converted) == [500, 2345]
+    assert skipped == []
+    assert [os.path.basename(path) for path, _ in failed] == ["data_broken.txt"]
+
+    with RecordingReader(os.path.join(run_dir, "buffered_data.anyskin")) as reader:
+        assert reader.num_mags == 5 and reader.temp_filtered
+        assert reader.layout.name == "anyskin"
+        assert reader.metadata["synthetic_timestamps"]
+        times, data = reader.read()
+        np.testing.assert_allclose(data, untimed, rtol=1e-6)
+        np.testing.assert_allclose(np.diff(times), 1e7)
+
+    path = os.path.join(root, "data", "data_2024-12-10_08-00-00.anyskin")
+    with RecordingReader(path) as reader:
+        assert reader.num_mags == 5 and not reader.temp_filtered
+        np.testing.assert_allclose(reader.samples(), timed, rtol=1e-6)
+
+    converted, skipped, failed = convert_tree(root, jobs=2)
+    assert converted == [] and len(failed) == 1
+    names = os.listdir(os.path.join(root, "data"))
+    assert not any(name.endswith(".partial") for name in names)
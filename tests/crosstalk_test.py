@@ -0,0 +1,48 @@
+import numpy as np
+
+from anyskin import CrosstalkCalibration
+
+
+def _mix(true_fields, leakage_ab, leakage_ba):
+    mixing = np.eye(30)
+    mixing[:15, 15:] = leakage_ab
+    mixing[15:, :15] = leakage_ba
+    return true_fields @ mixing
+
+
+def test_fit_and_apply_recovers_true_fields(tmp_path):
+    rng = np.random.default_rng(0)
+    leakage_ab = 0.05 * rng.normal(size=(15, 15))
+    leakage_ba = 0.05 * rng.normal(size=(15, 15))
+
+    press_a = np.zeros((500, 30))
+    press_a[:, :15] = rng.normal(scale=100.0, size=(500, 15))
+    press_b = np.zeros((500, 30))
+    press_b[:, 15:] = rng.normal(scale=100.0, size=(500, 15))
+
+    calibration = CrosstalkCalibration(5, 5, board_ids=("left", "right"))
+    calibration.fit(
+        _mix(press_a, leakage_ab, leakage_ba), _mix(press_b, leakage_ab, leakage_ba)
+    )
+    np.testing.assert_allclose(calibration.leakage_ab, leakage_ab, atol=1e-6)
+    np.testing.assert_allclose(calibration.leakage_ba, leakage_ba, atol=1e-6)
+
+    both = rng.normal(scale=100.0, size=(50, 30))
+    observed = _mix(both, leakage_ab, leakage_ba)
+    np.testing.assert_allclose(calibration.apply(observed), both, atol=1e-4)
+    np.testing.assert_allclose(calibration.apply(observed[0]), both[0], atol=1e-4)
+
+    calibration.save(str(tmp_path))
+    cached = CrosstalkCalibration.load(("left", "right"), cache_dir=str(tmp_path))
+    np.testing.assert_allclose(cached.mixing, calibration.mixing)
+    assert CrosstalkCalibration.load(("right", "left"), cache_dir=str(tmp_path)) is None
+
+
+def test_temperature_channels_pass_through():
+    calibration = CrosstalkCalibration(1, 1, temp_filtered=False)
+    calibration.mixing[:3, 3:] = np.eye(3)
+    calibration._unmixing = np.linalg.inv(calibration.mixing)
+    frame = np.array([25.0, 1.0, 2.0, 3.0, 26.0, 1.0, 2.0, 3.0])
+    np.testing.assert_allclose(
+        calibration.apply(frame), [25.0, 1.0, 2.0, 3.0, 26.0, 0.0, 0.0, 0.0]
+    )
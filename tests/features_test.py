@@ -0,0 +1,62 @@
+import numpy as np
+
+from anyskin import WindowFeatures
+
+
+def _reference(window_data, sample_rate, bands):
+    n = len(window_data)
+    k = np.arange(n)
+    slope = np.polyfit(k, window_data, 1)[0] * sample_rate
+    spectrum = np.fft.rfft(window_data, axis=0)
+    freqs = np.fft.rfftfreq(n, d=1.0 / sample_rate)
+    scale = np.where((k[: len(freqs)] == 0) | (2 * k[: len(freqs)] == n), 1.0, 2.0)
+    power = np.abs(spectrum) ** 2 * scale[:, None] / n**2
+    band_power = [power[(freqs >= lo) & (freqs < hi)].sum(axis=0) for lo, hi in bands]
+    return np.column_stack(
+        [
+            window_data.mean(axis=0),
+            window_data.std(axis=0),
+            window_data.min(axis=0),
+            window_data.max(axis=0),
+            slope,
+        ]
+        + band_power
+    ).reshape(-1)
+
+
+def test_matches_recompute_over_sliding_window():
+    rng = np.random.default_rng(0)
+    window, rate = 40, 200.0
+    bands = ((1.0, 20.0), (20.0, 60.0))
+    t = np.arange(500) / rate
+    data = np.column_stack(
+        [np.sin(2 * np.pi * 10 * t), 100 + 5 * t, rng.normal(size=len(t))]
+    )
+    features = WindowFeatures(3, window=window, sample_rate=rate, bands=bands)
+    for end in (10, 40, 41, 79, 80, 233, 500):
+        features.update(data[features._count : end])
+        start = max(0, end - window)
+        if end >= window:
+            expected = _reference(data[start:end], rate, bands)
+            np.testing.assert_allclose(features.features, expected, atol=1e-8)
+        else:
+            np.testing.assert_allclose(
+                features.features.reshape(3, -1)[:, :4],
+                _reference(data[start:end], rate, bands).reshape(3, -1)[:, :4],
+                atol=1e-8,
+            )
+    assert features.is_ready
+
+
+def test_feature_vector_layout():
+    features = WindowFeatures(2, window=10, bands=((1.0, 10.0),))
+    assert features.num_features == 6
+    assert features.features.shape == (12,)
+    assert features.feature_names[:6] == [
+        "mean_0",
+        "std_0",
+        "min_0",
+        "max_0",
+        "slope_0",
+        "power_1_10Hz_0",
+    ]
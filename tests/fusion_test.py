@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from anyskin import StreamFusion
+
+
+def _stream(times, slope, num_channels=3):
+    times = np.asarray(times, dtype=float)
+    data = slope * times[:, None] * np.ones((1, num_channels))
+    return np.hstack((times[:, None], data))
+
+
+def test_linear_alignment_on_reference_timeline():
+    fusion = StreamFusion([3, 3], policy="linear")
+    fusion.push(0, _stream(np.arange(0.0, 1.0, 0.1), 1.0))
+    fusion.push(1, _stream(np.arange(0.05, 1.0, 0.1), 2.0))
+
+    times, frames = fusion.pull()
+    assert frames.shape == (len(times), 6)
+    assert times[0] == pytest.approx(0.1)
+    np.testing.assert_allclose(frames[:, :3], times[:, None] * np.ones((1, 3)))
+    np.testing.assert_allclose(frames[:, 3:], 2 * times[:, None] * np.ones((1, 3)))
+
+
+def test_fixed_rate_is_continuous_across_pulls():
+    fusion = StreamFusion([3, 3], policy="hold", rate=100.0)
+    all_times = []
+    for start in range(0, 100, 10):
+        t = np.arange(start, start + 10) * 0.01
+        fusion.push(0, _stream(t, 1.0))
+        fusion.push(1, _stream(t + 0.001, 1.0))
+        times, _ = fusion.pull()
+        all_times.extend(times)
+    np.testing.assert_allclose(np.diff(all_times), 0.01)
+
+
+def test_nearest_policy():
+    fusion = StreamFusion([1, 1], policy="nearest", rate=10.0)
+    fusion.push(0, [[0.0, 0.0], [0.2, 2.0]])
+    fusion.push(1, [[0.0, 0.0], [0.06, 6.0], [0.2, 20.0]])
+    _, frames = fusion.pull()
+    np.testing.assert_allclose(frames, [[0.0, 0.0], [0.0, 6.0], [2.0, 20.0]])
+
+
+def test_lagging_stream_is_held_after_max_lag():
+    fusion = StreamFusion([1, 1], policy="linear", rate=100.0, max_lag=0.05)
+    fusion.push(0, _stream(np.arange(0, 20) * 0.01, 1.0, num_channels=1))
+    fusion.push(1, [[0.0, 5.0]])
+    times, frames = fusion.pull()
+    assert times[-1] == pytest.approx(0.14)
+    np.testing.assert_allclose(frames[:, 1], 5.0)
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        StreamFusion([3], policy="cubic")
@@ -0,0 +1,46 @@
+import numpy as np
+
+from anyskin import InterferenceMonitor
+
+
+def _coupled_frames(num_frames, coupling, seed=0):
+    rng = np.random.default_rng(seed)
+    board_b = rng.normal(size=(num_frames, 15))
+    board_a = rng.normal(size=(num_frames, 15))
+    # Chip 0 on board A picks up the field of chip 2 on board B
+    board_a[:, 0:3] += coupling * board_b[:, 6:9]
+    return np.hstack((board_a, board_b))
+
+
+def test_sliding_window_matches_recompute():
+    frames = _coupled_frames(700, 2.0)
+    monitor = InterferenceMonitor(window=200)
+    for batch in np.array_split(frames, 37):
+        monitor.update(batch)
+    assert monitor.count == 200
+
+    expected = np.cov(frames[-200:], rowvar=False, bias=True)[:15, 15:]
+    np.testing.assert_allclose(monitor.cross_covariance, expected, atol=1e-10)
+    expected_corr = np.corrcoef(frames[-200:], rowvar=False)[:15, 15:]
+    np.testing.assert_allclose(monitor.correlation, expected_corr, atol=1e-10)
+
+
+def test_exponential_window_matches_weighted_recompute():
+    frames = _coupled_frames(300, 1.0)
+    monitor = InterferenceMonitor(halflife=50.0)
+    for batch in np.array_split(frames, 7):
+        monitor.update(batch)
+
+    weights = 0.5 ** (np.arange(len(frames))[::-1] / 50.0)
+    expected = np.cov(frames, rowvar=False, aweights=weights, bias=True)[:15, 15:]
+    np.testing.assert_allclose(monitor.cross_covariance, expected, atol=1e-10)
+
+
+def test_scores_flag_coupled_chip_pair():
+    monitor = InterferenceMonitor(window=2000)
+    monitor.update(_coupled_frames(2000, 3.0))
+    scores = monitor.scores
+    assert scores.shape == (5, 5)
+    assert np.unravel_index(np.argmax(scores), scores.shape) == (0, 2)
+    assert scores[0, 2] > 0.4
+    assert np.delete(scores.ravel(), 2).max() < 0.1
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from anyskin import BoardLayout, get_layout
+
+
+def _rotate_xy(angle, field):
+    rotation = np.array(
+        [[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]]
+    )
+    return rotation @ field[:2]
+
+
+def test_transform_matches_per_chip_rotation():
+    layout = get_layout("anyskin")
+    rng = np.random.default_rng(0)
+    data = rng.normal(size=(4, 15))
+
+    out = layout.transform(data)
+    assert out.shape == (4, 5, 3)
+    for n in range(4):
+        frame = data[n].reshape(-1, 3)
+        for magid in range(5):
+            expected = _rotate_xy(layout.chip_rotations[magid], frame[magid])
+            np.testing.assert_allclose(out[n, magid, :2], expected)
+            np.testing.assert_allclose(out[n, magid, 2], frame[magid, 2])
+
+
+def test_axis_signs_flip_before_rotating():
+    layout = get_layout("joystick")
+    frame = np.arange(1.0, 16.0)
+    out = layout.transform(frame)[0]
+    for magid in range(5):
+        expected = _rotate_xy(layout.chip_rotations[magid], -frame[3 * magid : 3 * magid + 3])
+        np.testing.assert_allclose(out[magid, :2], expected, atol=1e-12)
+        np.testing.assert_allclose(out[magid, 2], -frame[3 * magid + 2])
+
+
+def test_composed_rig():
+    single = get_layout("anyskin")
+    pair = get_layout("anyskin_pair")
+    assert pair.num_mags == 10 and pair.num_boards == 2
+    np.testing.assert_allclose(
+        pair.pixel_positions(600)[5:], single.pixel_positions(600) + [600, 0]
+    )
+
+    rng = np.random.default_rng(1)
+    data = rng.normal(size=(3, 30))
+    out = pair.transform(data)
+    np.testing.assert_allclose(out[:, :5], single.transform(data[:, :15]))
+    np.testing.assert_allclose(out[:, 5:], single.transform(data[:, 15:]))
+
+    # The second bislot board is mirrored in x before the board rotation
+    bislot = get_layout("anyskin_bislot")
+    mirrored = data[:, 15:].reshape(3, 5, 3) * [-1, 1, 1]
+    np.testing.assert_allclose(bislot.transform(data)[:, 5:], single.transform(mirrored))
+
+
+def test_unknown_layout():
+    with pytest.raises(KeyError, match="anyskin"):
+        get_layout("no_such_board")
+    assert isinstance(get_layout("joystick_reskin"), BoardLayout)
@@ -0,0 +1,69 @@
+import numpy as np
+
+from anyskin import RecordingReader, RecordingWriter, get_layout
+from anyskin.recording import load_data
+
+
+def _samples(n, num_channels=15, start=1700000000.0, rate=100.0):
+    rng = np.random.default_rng(0)
+    times = start + np.arange(n) / rate
+    return np.hstack((times[:, None], rng.normal(size=(n, num_channels))))
+
+
+def test_roundtrip_and_header(tmp_path):
+    path = str(tmp_path / "run" / "data.anyskin")
+    samples = _samples(2500)
+    with RecordingWriter(
+        path, 5, layout="anyskin", device_ids=["board0"], chunk_size=1000
+    ) as writer:
+        writer.write(samples[:10])
+        writer.write(samples[10])
+        writer.write(samples[11:])
+
+    with RecordingReader(path) as reader:
+        assert len(reader) == 2500
+        assert reader.num_mags == 5 and reader.num_channels == 15
+        assert reader.device_ids == ["board0"]
+        np.testing.assert_allclose(
+            reader.layout.rotations, get_layout("anyskin").rotations
+        )
+        np.testing.assert_allclose(reader.duration, 24.99, atol=1e-6)
+
+        times, data = reader.read()
+        assert times.dtype == np.int64 and data.dtype == np.float32
+        np.testing.assert_allclose(reader.samples(), samples, rtol=1e-6, atol=1e-6)
+        # Slices spanning chunk boundaries
+        np.testing.assert_allclose(reader.read(995, 2005)[1], samples[995:2005, 1:], rtol=1e-6)
+        assert len(reader.read(2400, 3000)[0]) == 100
+    np.testing.assert_allclose(load_data(path), samples[:, 1:], rtol=1e-6)
+
+
+def test_seek_by_time(tmp_path):
+    path = str(tmp_path / "data.anyskin")
+    samples = _samples(5000)
+    with RecordingWriter(path, 5, chunk_size=128) as writer:
+        writer.write(samples)
+
+    with RecordingReader(path) as reader:
+        assert reader.index_at(samples[0, 0] - 1.0) == 0
+        assert reader.index_at(samples[1234, 0]) == 1234
+        assert reader.index_at(samples[1234, 0] + 0.005) == 1235
+        assert reader.index_at(samples[-1, 0] + 1.0) == 5000
+        window = reader.read_time(samples[300, 0], samples[700, 0])
+        np.testing.assert_allclose(window, samples[300:700], rtol=1e-6, atol=1e-6)
+
+
+def test_recovers_unclosed_recording(tmp_path):
+    path = str(tmp_path / "data.anyskin")
+    samples = _samples(1050)
+    writer = RecordingWriter(path, 5, chunk_size=100)
+    writer.write(samples)
+    writer._file.flush()
+    # Simulate a crash in the middle of writing the next chunk
+    with open(path, "ab") as f:
+        f.write(b"ASKC\x10")
+
+    with RecordingReader(path) as reader:
+        assert len(reader) == 1000
+        np.testing.assert_allclose(reader.samples(), samples[:1000], rtol=1e-6, atol=1e-6)
+    writer._file.close()
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+import anyskin.replay
+from anyskin import RecordingWriter, Replay
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(anyskin.replay.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def recording(tmp_path):
+    path = str(tmp_path / "data.anyskin")
+    # 10 s at 100 Hz, with a gap between 4 s and 6 s
+    times = 1700000000.0 + np.arange(1000) / 100.0
+    times[400:] += 2.0
+    samples = np.hstack((times[:, None], np.arange(1000)[:, None] * np.ones(15)))
+    with RecordingWriter(path, 5, chunk_size=64) as writer:
+        writer.write(samples)
+    return path
+
+
+def test_plays_by_timestamp(clock, recording):
+    replay = Replay(recording, speed=2.0)
+    assert replay.get_frame()[0] == 0
+    clock.now += 1.0
+    assert replay.get_frame()[0] == 200
+    # Holds the last frame before the gap
+    clock.now += 1.5
+    assert replay.position == pytest.approx(5.0)
+    assert replay.get_frame()[0] == 399
+    clock.now += 1.0
+    assert replay.get_frame()[0] == 500
+    clock.now += 100.0
+    assert replay.finished
+    assert replay.get_frame()[0] == 999
+
+
+def test_pause_step_and_seek(clock, recording):
+    replay = Replay(recording)
+    clock.now += 0.5
+    replay.pause()
+    clock.now += 10.0
+    assert replay.get_frame()[0] == 50
+    replay.step(3)
+    assert replay.get_frame()[0] == 53
+    replay.step(-100)
+    assert replay.get_frame()[0] == 0
+
+    replay.play()
+    replay.seek(6.5)
+    assert replay.get_frame()[0] == 450
+    clock.now += 0.1
+    new = replay.get_new_samples()
+    np.testing.assert_array_equal(new[:, 1], np.arange(450, 461))
+
+
+def test_untimestamped_array(clock):
+    replay = Replay(np.arange(500)[:, None] * np.ones(15), rate=50.0)
+    assert replay.duration == pytest.approx(9.98)
+    clock.now += 2.0
+    assert replay.get_frame()[0] == 100
+    assert len(replay.get_new_samples()) == 101
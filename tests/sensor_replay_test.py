@@ -0,0 +1,70 @@
+import time
+
+import numpy as np
+import pytest
+
+from anyskin import AnySkinProcess, AnySkinReplay, RecordingWriter
+
+
+@pytest.fixture
+def recording(tmp_path):
+    """1 s of 5 chips with temperature at 200 Hz"""
+    path = str(tmp_path / "data.anyskin")
+    rng = np.random.default_rng(0)
+    times = 1700000000.0 + np.arange(200) / 200.0
+    data = rng.normal(scale=10.0, size=(200, 20))
+    data[:, ::4] = 25.0
+    with RecordingWriter(path, 5, temp_filtered=False, chunk_size=64) as writer:
+        writer.write(np.hstack((times[:, None], data)))
+    return path, data
+
+
+def test_replays_all_frames_as_fast_as_possible(recording):
+    path, data = recording
+    sensor = AnySkinReplay(path, speed=None, block_size=50)
+    start = time.monotonic()
+    samples = [sensor.get_sample() for _ in range(200)]
+    assert time.monotonic() - start < 0.5
+    with pytest.raises(EOFError):
+        sensor.get_sample()
+
+    times = np.array([t for t, _ in samples])
+    np.testing.assert_allclose(np.diff(times), 1 / 200.0, atol=1e-6)
+    field = np.array([s for _, s in samples])
+    np.testing.assert_allclose(field, np.delete(data, np.s_[::4], axis=1), rtol=1e-6)
+
+
+def test_scaled_timing_and_loop(recording):
+    path, data = recording
+    sensor = AnySkinReplay(path, temp_filtered=False, speed=4.0, loop=True)
+    start = time.monotonic()
+    samples = [sensor.get_sample() for _ in range(300)]
+    # 1.5 s of recorded time at 4x
+    assert 0.3 < time.monotonic() - start < 0.6
+    times = np.array([t for t, _ in samples])
+    np.testing.assert_allclose(np.diff(times), 1 / 200.0, atol=1e-6)
+    np.testing.assert_allclose(samples[250][1], data[50], rtol=1e-6)
+
+
+def test_rejects_mismatched_sensor(recording):
+    path, _ = recording
+    with pytest.raises(ValueError):
+        AnySkinReplay(path, num_mags=10)
+
+
+def test_drives_process(recording):
+    path, data = recording
+    sensor_stream = AnySkinProcess(num_mags=5, replay_file=path, replay_speed=None)
+    sensor_stream.start_buffering()
+    sensor_stream.start()
+    try:
+        assert sensor_stream.wait_replay_finished(timeout=10.0)
+        assert sensor_stream.sample_cnt == 200
+        buffer = np.array(sensor_stream.get_buffer(pause_if_buffering=True))
+        assert buffer.shape == (200, 16)
+        np.testing.assert_allclose(
+            buffer[:, 1:], np.delete(data, np.s_[::4], axis=1), rtol=1e-5
+        )
+        np.testing.assert_allclose(sensor_stream.last_reading, buffer[-1], rtol=1e-6)
+    finally:
+        sensor_stream.join()
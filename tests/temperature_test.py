@@ -0,0 +1,43 @@
+import numpy as np
+
+from anyskin import TemperatureCalibration, TemperatureCompensator
+
+
+def _drifting_samples(num_samples, seed=0):
+    rng = np.random.default_rng(seed)
+    temps = 25.0 + np.linspace(0.0, 10.0, num_samples)[:, None] + np.arange(3)
+    offset = temps - 25.0
+    field = 100.0 + 4.0 * offset[..., None] - 0.3 * offset[..., None] ** 2 * [1, 2, 3]
+    field += rng.normal(scale=0.01, size=field.shape)
+    return np.concatenate((temps[..., None], field), axis=-1).reshape(num_samples, -1)
+
+
+def test_fit_in_batches_removes_drift(tmp_path):
+    samples = _drifting_samples(5000)
+    calibration = TemperatureCalibration(num_mags=3, degree=2)
+    for batch in np.array_split(samples, 9):
+        calibration.partial_fit(batch)
+    calibration.fit()
+
+    path = str(tmp_path / "calibration.npz")
+    calibration.save(path)
+    compensator = TemperatureCompensator(
+        TemperatureCalibration.load(path), temp_filtered=True, decimation=1
+    )
+    compensated = compensator.apply(samples)
+    assert compensated.shape == (5000, 9)
+    assert np.ptp(samples.reshape(5000, 3, 4)[..., 1:], axis=0).min() > 5.0
+    assert np.ptp(compensated, axis=0).max() < 0.2
+
+
+def test_batched_and_framewise_compensation_match():
+    samples = _drifting_samples(1000)
+    calibration = TemperatureCalibration(num_mags=3, degree=1).fit(samples)
+
+    framewise = TemperatureCompensator(calibration, temp_filtered=False, decimation=7)
+    expected = np.array([framewise.update(s) for s in samples])
+
+    batched = TemperatureCompensator(calibration, temp_filtered=False, decimation=7)
+    actual = np.vstack([batched.apply(b) for b in np.array_split(samples, 13)])
+    np.testing.assert_allclose(actual, expected)
+    np.testing.assert_allclose(actual[:, ::4], samples[:, ::4])
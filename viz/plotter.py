@@ -1,33 +1,18 @@
-import os
-import pandas as pd
 import matplotlib.pyplot as plt
 import h5py
 
-base_folder = "/home/venky/temp/anyskin/viz/logs/2024_12_09"
+from anyskin import RunCatalog
 
-run_folders = sorted(os.listdir(base_folder))
-csv_files = [os.path.join(base_folder, folder, "buffered_data.csv") for folder in run_folders]
+logs_folder = "/home/venky/temp/anyskin/viz/logs"
 
-first_5_files = csv_files[:5]
-last_5_files = csv_files[5:10]
-last_file = csv_files[-1]
+# Only runs that are new or changed since the last call are read
+catalog = RunCatalog(logs_folder)
+catalog.update()
+runs, last_readings = catalog.last_readings(date="2024-12-09")
 
-def extract_last_readings(files):
-    readings = []
-    for file in files:
-        df = pd.read_csv(file)
-        df.columns = [
-            "Bx0", "By0", "Bz0", "Bx1", "By1", "Bz1",
-            "Bx2", "By2", "Bz2", "Bx3", "By3", "Bz3",
-            "Bx4", "By4", "Bz4"
-        ]
-        last_row = df.iloc[-1].values
-        readings.append(last_row)
-    return readings
-
-first_5_readings = extract_last_readings(first_5_files)
-last_5_readings = extract_last_readings(last_5_files)
-last_reading = extract_last_readings([last_file])[0]  # Single reading, no list
+first_5_readings = last_readings[:5]
+last_5_readings = last_readings[5:10]
+last_reading = last_readings[-1]
 
 b_labels = ["Bx0", "By0", "Bz0", "Bx1", "By1", "Bz1",
             "Bx2", "By2", "Bz2", "Bx3", "By3", "Bz3",